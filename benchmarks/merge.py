@@ -0,0 +1,45 @@
+"""
+Times pambdas.merge at 10k x 10k and 1M x 10k rows, with unsorted keys (hash
+join) and sorted keys (sort-merge join)
+
+Run from the repository root with `python -m benchmarks.merge`
+"""
+import random
+import time
+import pambdas as pam
+
+
+def frame(keys, name):
+    return pam.DataFrame({"key": keys, name: list(range(len(keys)))})
+
+
+def main():
+    random.seed(0)
+    for left_rows, right_rows in ((10000, 10000), (1000000, 10000)):
+        # about half of the left keys find one match in right
+        left_keys = [random.randrange(20000) for _ in range(left_rows)]
+        right_keys = random.sample(range(20000), right_rows)
+        for order in ("unsorted", "sorted"):
+            if order == "sorted":
+                left_keys.sort()
+                right_keys.sort()
+            left = frame(left_keys, "left")
+            right = frame(right_keys, "right")
+            for how in ("inner", "left", "outer"):
+                start = time.perf_counter()
+                res = pam.merge(left, right, on="key", how=how)
+                print(
+                    "%s x %s %s %s: %.3fs, %s rows"
+                    % (
+                        left_rows,
+                        right_rows,
+                        order,
+                        how,
+                        time.perf_counter() - start,
+                        len(res),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
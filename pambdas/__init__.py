@@ -2,8 +2,12 @@
 Contains a DataFrame and Series class, as well as a nan type
 """
 __version__ = "0.0.1"
-from .dataframe import DataFrame, read_csv
+from .dataframe import DataFrame
+from .io import read_csv, read_json
 from .series import Series
+from .index import Index, RangeIndex
+from .merge import merge, merge_asof
+from .pam import attach_shared, read_pam
 from .other_stuff import nan, concat
 
 # def clean_slices(phase, info):
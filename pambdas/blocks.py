@@ -0,0 +1,114 @@
+"""
+Contains the BlockManager, the column-major storage behind a DataFrame
+"""
+from .other_stuff import nan
+from .storage import set_value, to_list
+
+
+class BlockManager:
+    """
+    Column-major storage: one list (or array) per column.
+
+    blocks: list of columns. Every column holds at least `step` values.
+    step: number of rows in storage. A DataFrame's view selects rows and
+    columns out of this.
+
+    Columns can be shared between DataFrames and Series, so adding, dropping or
+    reordering a column only builds a new list of column references. A typed
+    column that has to become a list to hold a value is replaced in blocks, so
+    it stays shared by the DataFrames and Series reading this manager. The
+    manager can also be indexed like a flat, column-major list, where position
+    k is row k % step of column k // step. This is what Series taken along a
+    row use as their data.
+    """
+
+    def __init__(self, blocks=None, step=0):
+        self.blocks = list(blocks) if blocks is not None else []
+        self.step = step
+
+    @classmethod
+    def from_flat(cls, data, step):
+        """
+        Splits a flat, column-major list into columns
+        """
+        if not step:
+            return cls([], step)
+        return cls(
+            [data[i * step : (i + 1) * step] for i in range(len(data) // step)], step
+        )
+
+    @classmethod
+    def from_columns(cls, columns, step=None):
+        """
+        Creates storage from columns, padding short columns with nan
+        :param columns: iterable of lists or arrays
+        :param step: int, number of rows. Defaults to the length of the first column
+        """
+        blocks = []
+        for col in columns:
+            if step is None:
+                step = len(col)
+            if len(col) < step:
+                col = to_list(col) + [nan] * (step - len(col))
+            blocks.append(col)
+        return cls(blocks, step or 0)
+
+    def __len__(self):
+        return self.step * len(self.blocks)
+
+    def __iter__(self):
+        for block in self.blocks:
+            for i in range(self.step):
+                yield block[i]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._get(k) for k in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        return self._get(key)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            keys = range(*key.indices(len(self)))
+            if len(value) != len(keys):
+                raise ValueError(
+                    "attempt to assign sequence of size %s to slice of size %s"
+                    % (len(value), len(keys))
+                )
+            for k, val in zip(keys, value):
+                col, row = divmod(k, self.step)
+                self.blocks[col] = set_value(self.blocks[col], row, val)
+            return
+        if key < 0:
+            key += len(self)
+        col, row = divmod(key, self.step)
+        self.blocks[col] = set_value(self.blocks[col], row, value)
+
+    def _get(self, key):
+        col, row = divmod(key, self.step)
+        if row >= self.step or col >= len(self.blocks) or key < 0:
+            raise IndexError("BlockManager index out of range")
+        return self.blocks[col][row]
+
+    def view_blocks(self, view):
+        """
+        Yields the viewed rows of each viewed column
+        :param view: tuple of two slices, rows and columns
+        """
+        rows = view[0]
+        for block in self.blocks[view[1]]:
+            yield block[rows]
+
+    def trimmed(self, view):
+        """
+        Returns a copy holding only the viewed rows and columns
+        """
+        return BlockManager(self.view_blocks(view), view[0].stop - view[0].start)
+
+    def select(self, col_indices):
+        """
+        Returns storage sharing the given columns, in the given order
+        """
+        blocks = self.blocks
+        return BlockManager([blocks[i] for i in col_indices], self.step)
@@ -1,35 +1,53 @@
 """
 Contains the DataFrame class
 """
+from array import array
 import itertools
-import csv
-import functools
+import operator
 from .series import Series
 from .indexers import ILocDF, LocDF
-from .other_stuff import nan, is_bool, is_2d_bool
+from .blocks import BlockManager
+from .groupby import GroupBy
+from .merge import merge
+from .parallel import combine, map_split
+from .index import Index, RangeIndex, ensure_index
+from .other_stuff import argsort, nan, is_bool, is_2d_bool, top_positions
+from .storage import (
+    compare,
+    invert_mask,
+    is_typed,
+    logical,
+    take,
+    to_list,
+    to_typed,
+)
 
 
 class DataFrame:
     """
-    The only mutable attribute is the data.
+    Data is a BlockManager (see blocks.py) holding one list per column, or an
+    array for typed columns (see storage.py). Columns are shared between
+    DataFrames and Series, so changes to one show up in the others.
     Shape is equal to the view.
-    If a row is added, data is recreated and step is also updated.
-    If a column is added, data is appended *only* if the dataframe view covers
-    the entire dataset (shape equals len index, columns). Otherwise, a copy is made
-    View is a tuple of two slices, for the row and column. Steps are not taken into
-    account in view, it is high level. This is contrary to Series
-    step = len(index) = shape(0) = view[0].stop - view[0].start
+    View is a tuple of two slices, for the row and column, into the blocks.
+    If a column is added, dropped or reordered, only the list of column
+    references is rebuilt. If a row is added, nan is appended to each column,
+    unless the view doesn't end at the last row, in which case a copy is made.
+    step = number of rows in storage
+    len(index) = shape(0) = view[0].stop - view[0].start
     len(columns) = shape(1) = view[1].stop - view[1].start
     """
 
-    ITERABLE_1D = (list, set, tuple, Series)
+    ITERABLE_1D = (list, set, tuple, array, Series)
 
-    def __init__(self, data=None, index=None, columns=None):
-        self.columns = tuple(columns) if columns else tuple()  # type: tuple
-        self.index = tuple(index) if index else tuple()  # type: tuple
-        self.data = []  # type: list
+    def __init__(self, data=None, index=None, columns=None, typed=False):
+        """
+        :param typed: bool, store homogeneous int/float/bool columns in arrays
+        """
+        self.columns = columns if columns else Index()  # type: Index
+        self.index = index if index else Index()  # type: Index
+        self.data = BlockManager()  # type: BlockManager
         self.name = None  # type: str
-        self.step = 0  # type: int
         self.shape = (0, 0)  # type: tuple
         self.view = (slice(0, 0), slice(0, 0))  # type: tuple
         self.iloc = ILocDF(self)  # type: ILocDF
@@ -37,9 +55,9 @@ class DataFrame:
 
         if data is None:
             return
+        blocks = []
         if isinstance(data, dict):
-            self.step = len(data[list(data.keys())[0]])
-            self.data = list(itertools.chain(*data.values()))
+            blocks = [copy_column(col) for col in data.values()]
             self.columns = tuple(data.keys())
         elif isinstance(data, list):
             if isinstance(data[0], self.ITERABLE_1D):
@@ -49,35 +67,45 @@ class DataFrame:
                     self.columns = data[0].index
                 except AttributeError:
                     pass
-                self.step = len(data)
-
-                data = list(zip(*data))
-                for item in data:
-                    self.data.extend(item)
+                blocks = [list(col) for col in zip(*data)]
+                if not blocks:
+                    blocks = [[] for _ in data]
 
             elif isinstance(data[0], dict):
+                columns = []
                 for d_dict in data:
                     key, val = next(iter(d_dict.items()))
-                    self.columns = self.columns + (key,)
-                    self.data.extend(val)
-                self.step = len(val)
+                    columns.append(key)
+                    blocks.append(copy_column(val))
+                self.columns = columns
+
+        if typed:
+            blocks = [to_typed(block) for block in blocks]
+        self.data = BlockManager.from_columns(blocks)
 
         if len(self.columns) == 0:
-            self.columns = tuple(i for i in range(len(self.data) // self.step))
+            self.columns = RangeIndex(len(self.data.blocks))
 
         if len(self.index) == 0:
-            self.index = tuple(i for i in range(self.step))
+            self.index = RangeIndex(self.step)
         self.shape = (self.step, len(self.columns))
         self.view = (slice(0, self.shape[0]), slice(0, self.shape[1]))
 
     @classmethod
     def from_data(cls, data, index, columns, view, step):
+        """
+        Creates a DataFrame from storage
+
+        :param data: BlockManager, or a flat column-major list
+        :param step: int, number of rows in storage, used to split a flat list
+        """
         self = cls()
+        if not isinstance(data, BlockManager):
+            data = BlockManager.from_flat(data, step)
         self.data = data
         self.columns = columns
         self.index = index
         self.view = view
-        self.step = step
         self.shape = (
             self.view[0].stop - self.view[0].start,
             self.view[1].stop - self.view[1].start,
@@ -95,6 +123,26 @@ class DataFrame:
     def series_from_data(cls, *args):
         return Series.from_data(*args)
 
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, labels):
+        self._index = ensure_index(labels)
+
+    @property
+    def step(self):
+        return self.data.step
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @columns.setter
+    def columns(self, labels):
+        self._columns = ensure_index(labels)
+
     def __str__(self):
         string = "DataFrame: " + "\n" + str(self.columns) + "\n"
         string += "\n".join(str(d) for d in zip(self.index, self.values))
@@ -125,44 +173,85 @@ class DataFrame:
     def __delitem__(self, cols):
         self.drop(cols)
 
+    def compare(self, other, op):
+        """
+        Compares every viewed value with a scalar, returning a boolean DataFrame
+        with one BoolArray mask per column
+
+        :param other: scalar
+        :param op: comparison function, e.g. operator.lt
+        :return: DataFrame
+        """
+        return self.from_blocks(
+            [compare(block, other, op) for block in self.view_blocks()],
+            self.index,
+            self.columns,
+        )
+
     def __lt__(self, other):
-        df = self.copy()
-        df.data = [item < other for item in df.data]
-        return df
+        return self.compare(other, operator.lt)
 
     def __le__(self, other):
-        df = self.copy()
-        df.data = [item <= other for item in df.data]
-        return df
+        return self.compare(other, operator.le)
 
     def __gt__(self, other):
-        df = self.copy()
-        df.data = [item > other for item in df.data]
-        return df
+        return self.compare(other, operator.gt)
 
     def __ge__(self, other):
-        df = self.copy()
-        df.data = [item >= other for item in df.data]
-        return df
+        return self.compare(other, operator.ge)
 
     def __eq__(self, other):
-        df = self.copy()
-        df.data = [item == other for item in df.data]
-        return df
+        return self.compare(other, operator.eq)
 
     def __ne__(self, other):
-        df = self.copy()
-        df.data = [item != other for item in df.data]
-        return df
+        return self.compare(other, operator.ne)
+
+    def logical(self, other, op):
+        """
+        Combines a boolean DataFrame elementwise with another one of the same
+        shape, or with a bool, one column at a time
+
+        :param other: DataFrame or bool
+        :param op: operator.and_, operator.or_ or operator.xor
+        :return: DataFrame
+        """
+        if isinstance(other, self.__class__):
+            if other.shape != self.shape:
+                raise ValueError("Can only combine DataFrames of the same shape")
+            others = other.view_blocks()
+        else:
+            others = itertools.repeat(other)
+        return self.from_blocks(
+            [
+                logical(block, other_block, op)
+                for block, other_block in zip(self.view_blocks(), others)
+            ],
+            self.index,
+            self.columns,
+        )
+
+    def __and__(self, other):
+        return self.logical(other, operator.and_)
+
+    def __or__(self, other):
+        return self.logical(other, operator.or_)
+
+    def __xor__(self, other):
+        return self.logical(other, operator.xor)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
 
     def __iter__(self):
         return iter(self.columns)
 
     def __invert__(self):
-        df_cp = self.copy()
-        for i in range(len(df_cp.data)):
-            df_cp.data[i] = not df_cp.data[i]
-        return df_cp
+        return self.from_blocks(
+            [invert_mask(block) for block in self.view_blocks()],
+            self.index,
+            self.columns,
+        )
 
     def __len__(self):
         return self.shape[0]
@@ -172,46 +261,31 @@ class DataFrame:
 
     def drop(self, labels=None):
         """
-        Drop both removes a specified column and trims internal data, producing a copy.
+        Drop removes a specified column in place. The remaining columns are still
+        shared with other DataFrames.
+        Without labels, it trims the data to the view instead, producing a copy.
 
-        column_index: a column to drop
+        labels: a column to drop
         :return:
         """
-        to_delete = self.view[1].stop
-        num = 0
-        if isinstance(labels, str):
-            to_delete = self.columns.index(labels)
-            num = 1
-
-        # build new dataset without the old columns
-        data_cols = []
-
-        for col_index in range(self.view[1].start, to_delete):
-            data_cols.append(
-                self.data[
-                    self.view[0].start
-                    + col_index * self.step : self.view[0].stop
-                    + col_index * self.step
-                ]
-            )
+        if labels is None:
+            self.data = self.data.trimmed(self.view)
+            self.view = (slice(0, self.shape[0]), slice(0, self.shape[1]))
+            return
 
-        for col_index in range(to_delete + num, self.view[1].stop):
-            data_cols.append(
-                self.data[
-                    self.view[0].start
-                    + col_index * self.step : self.view[0].stop
-                    + col_index * self.step
-                ]
+        to_delete = self.columns.get_loc(labels)
+        col_start = self.view[1].start
+        self.data = self.data.select(
+            itertools.chain(
+                range(col_start, col_start + to_delete),
+                range(col_start + to_delete + 1, self.view[1].stop),
             )
-        self.data = []
-        for col in data_cols:
-            self.data.extend(col)
+        )
 
         #    and adjust our indexing
-        self.columns = self.columns[0:to_delete] + self.columns[to_delete + num :]
-        self.shape = (self.shape[0], self.shape[1] - num)
-        self.view = (slice(0, len(self.index)), slice(0, len(self.columns)))
-        self.step = len(self.index)
+        self.columns = self.columns[0:to_delete] + self.columns[to_delete + 1 :]
+        self.shape = (self.shape[0], self.shape[1] - 1)
+        self.view = (self.view[0], slice(0, self.shape[1]))
 
     def copy(self):
         """
@@ -224,21 +298,42 @@ class DataFrame:
         df.drop()
         return df
 
+    @classmethod
+    def from_blocks(cls, blocks, index, columns):
+        """
+        Creates a DataFrame that owns a new set of columns
+        :param blocks: list of lists or arrays, one per column
+        """
+        step = len(index)
+        return cls.from_data(
+            BlockManager(blocks, step),
+            index,
+            columns,
+            (slice(0, step), slice(0, len(columns))),
+            step,
+        )
+
+    def view_blocks(self):
+        """
+        Yields the viewed rows of each viewed column
+        """
+        return self.data.view_blocks(self.view)
+
     def equals(self, other):
         return (self.values == other.values) and (self.shape == other.shape)
 
     @property
     def values(self):
-        data_rows = []
-        for row_index in range(self.view[0].start, self.view[0].stop):
-            data_rows.append(
-                self.data[
-                    row_index
-                    + self.step * self.view[1].start : row_index
-                    + self.step * self.view[1].stop : self.step
-                ]
-            )
-        return data_rows
+        if self.shape[1] == 0:
+            return [[] for _ in range(self.shape[0])]
+        return [list(row) for row in zip(*self.view_blocks())]
+
+    @property
+    def typed(self):
+        """
+        Whether every column is held in typed storage
+        """
+        return all(is_typed(block) for block in self.data.blocks[self.view[1]])
 
     def bound_int_to_df(self, raw_int, axis):
         """
@@ -315,7 +410,20 @@ class DataFrame:
         :param axis:
         :return:
         """
-        return [self.bound_int_to_df(item, axis) for item in raw_iter]
+        if axis in [0, "row", "rows"]:
+            view_min = self.view[0].start
+            view_max = self.view[0].stop
+        elif axis in [1, "column", "columns"]:
+            view_min = self.view[1].start
+            view_max = self.view[1].stop
+        else:
+            raise UserWarning
+
+        # same rules as bound_int_to_df, checked once for the whole iterable
+        res = [view_max + item if item < 0 else view_min + item for item in raw_iter]
+        if res and (min(res) < view_min or max(res) > view_max):
+            raise IndexError
+        return res
 
     def convert_slice(self, raw_slice, axis):
         """
@@ -351,7 +459,7 @@ class DataFrame:
         Checks if the shape is the sshape of the entire data
         :return:
         """
-        return self.shape[0] != self.step or self.shape[1] != len(self.data) / self.step
+        return self.shape[0] != self.step or self.shape[1] != len(self.data.blocks)
 
     def index_of(self, item, axis=0):
         """
@@ -368,46 +476,54 @@ class DataFrame:
             # bypass for boolean
             if is_bool(item):
                 return item
-            return [names.index(i) for i in item]
+            return [names.get_loc(i) for i in item]
         elif isinstance(item, slice):
-            start = None if item.start is None else names.index(item.start)
-            stop = None if item.stop is None else names.index(item.stop)
+            start = None if item.start is None else names.get_loc(item.start)
+            stop = None if item.stop is None else names.get_loc(item.stop)
             return slice(start, stop)
         else:
             try:
-                return names.index(item)
-            except ValueError:
+                return names.get_loc(item)
+            except KeyError:
                 return None
 
     def add_empty_series(self, name, axis=0):
         """
         Adds a new row/column to a dataframe.
 
-        If the dataframe is a view, it will make a copy of itself and trim its
+        A column is added by building a new list of column references, so the
+        existing columns are still shared. A row is added by appending nan to
+        each column. If the view doesn't end at the last row of every column,
+        it will make a copy of itself first.
         :param name: Index/column name
         :param axis: int; 0 - adds a row. 1 - adds a column
         :return: None. Does so in place.
         """
-        # if its a view, make a copy
-        if self.is_view():
-            self.drop()
-
+        view = self.view
         # Add a row
         if axis == 0:
-            self.index = self.index + (name,)
-            ndata = []
-            for i in range(self.shape[1]):
-                ndata.extend(self.data[i * self.step : (i + 1) * self.step] + [nan])
-            self.data = ndata
+            blocks = self.data.blocks[view[1]]
+            if any(len(block) != view[0].stop for block in blocks):
+                self.drop()
+                view = self.view
+                blocks = self.data.blocks
+            for i, block in enumerate(blocks):
+                if is_typed(block):
+                    # nan can't be stored in an array
+                    blocks[i] = block = to_list(block)
+                block.append(nan)
+            self.index = self.index.append(name)
+            self.data = BlockManager(blocks, view[0].stop + 1)
             self.shape = (self.shape[0] + 1, self.shape[1])
-            self.view = (slice(self.view[0].start, self.view[0].stop + 1), self.view[1])
-            self.step = self.step + 1
+            self.view = (slice(view[0].start, view[0].stop + 1), slice(0, len(blocks)))
         # add a column
         elif axis == 1:
-            self.columns = self.columns + (name,)
-            self.data = self.data + [nan] * self.shape[0]
+            self.columns = self.columns.append(name)
+            self.data = BlockManager(
+                self.data.blocks[view[1]] + [[nan] * self.step], self.step
+            )
             self.shape = (self.shape[0], self.shape[1] + 1)
-            self.view = (self.view[0], slice(self.view[1].start, self.view[1].stop + 1))
+            self.view = (view[0], slice(0, self.shape[1]))
 
     def append(self, other, ignore_index=False):
         """
@@ -474,12 +590,47 @@ class DataFrame:
             {k: v for k, v in zip(columns, data_columns)}, index=index
         )
 
-    def applymap(self, func):
-        cp = self.copy()
-        cp.data = [func(item) for item in cp.data]
-        return cp
-
-    def apply(self, func, axis=0, dropna=True):
+    def applymap(self, func, workers=None):
+        """
+        Applies a function to every value
+        :param func: function of one value
+        :param workers: int, number of processes to split the rows across. func
+        must then be picklable, e.g. defined at the top of a module.
+        :return: DataFrame
+        """
+        if workers is not None and workers > 1:
+            return combine(
+                map_split(self, DataFrame.applymap, workers=workers, args=(func,))
+            )
+        blocks = []
+        for block in self.view_blocks():
+            res = [func(item) for item in block]
+            blocks.append(to_typed(res) if is_typed(block) else res)
+        return self.from_blocks(blocks, self.index, self.columns)
+
+    def apply(self, func, axis=0, dropna=True, workers=None):
+        """
+        Applies a function to each column or row, as a Series. Reducing
+        functions make a Series, others are applied elementwise.
+
+        :param func: function
+        :param axis: int, 0 for each column, 1 for each row
+        :param dropna: bool, drop nans before applying func
+        :param workers: int, number of processes to split the columns (axis=0)
+        or rows (axis=1) across, in contiguous blocks. func must then be
+        picklable, e.g. defined at the top of a module.
+        :return: Series or DataFrame
+        """
+        if workers is not None and workers > 1:
+            by = 1 if axis == 0 else 0
+            results = map_split(
+                self,
+                DataFrame.apply,
+                workers=workers,
+                axis=by,
+                args=(func, axis, dropna),
+            )
+            return combine(results, by)
 
         res = []
         index = []
@@ -516,6 +667,20 @@ class DataFrame:
         else:
             return Series(res, index, name=self.name)
 
+    def map_partitions(self, func, npartitions=None, workers=None):
+        """
+        Calls a function on contiguous blocks of rows in a process pool. Each
+        task only ships the column data, index and labels of its rows.
+
+        :param func: picklable function, e.g. defined at the top of a module,
+        taking a DataFrame
+        :param npartitions: int, number of blocks, defaults to one per worker
+        :param workers: int, number of processes, defaults to the number of CPUs
+        :return: DataFrame or Series of the results joined in order, or a list
+        of the results if they are neither
+        """
+        return combine(map_split(self, func, npartitions, workers))
+
     def iterrows(self):
         for i in range(len(self)):
             try:
@@ -536,53 +701,206 @@ class DataFrame:
     def transpose(self):
         new_cols = self.index
         new_index = self.columns
-        data = list(zip(*self.values))
+        # the columns become rows
+        data = [to_list(block) for block in self.view_blocks()]
         cp = self.class_init(data, columns=new_cols, index=new_index)
         return cp
 
     def sort_values(self, by, ascending=True, axis=0, na_position="last"):
+        """
+        Sorts the rows by the values of one or more columns, or the columns by
+        the values of one or more rows for axis=1
+        :param by: label, or list of labels, most significant first
+        :param ascending: bool, or list of bools, one per label
+        :param axis: int, 0 to sort rows, 1 to sort columns
+        :param na_position: str, 'first' or 'last'
+        :return: DataFrame, sorted
+        """
         if axis == 0:
-            it = self.itercols
-            ser = self.loc[:, by]
-
+            keys = self.column_values(by)
         else:
-            it = self.iterrows
-            ser = self.loc[by, :]
+            keys = []
+            for label in by if isinstance(by, list) else [by]:
+                ser = self.loc[label, :]
+                keys.append(ser.data[ser.view])
+        return self.take(argsort(keys, ascending, na_position), axis)
 
-        new_index = ser.sort_values(ascending, na_position).index
-        res = []
-        cols = []
+    def nlargest(self, n, columns):
+        """
+        Returns the n rows with the largest values, without sorting every row
+        :param n: int
+        :param columns: label, or list of labels compared in order
+        :return: DataFrame, from the largest row
+        """
+        return self.take(top_positions(self.column_values(columns), n))
 
-        for ser in it():
-            res.append(ser[1].loc[new_index])
-            cols.append(ser[0])
+    def nsmallest(self, n, columns):
+        """
+        Returns the n rows with the smallest values, without sorting every row
+        :param n: int
+        :param columns: label, or list of labels compared in order
+        :return: DataFrame, from the smallest row
+        """
+        return self.take(top_positions(self.column_values(columns), n, False))
 
-        cp = self.class_init(res, columns=cols)
+    def column_values(self, labels):
+        """
+        Returns the viewed values of each column
+        :param labels: label, or list of labels
+        :return: list of lists or arrays
+        """
+        labels = labels if isinstance(labels, list) else [labels]
+        res = []
+        for label in labels:
+            ser = self.loc[:, label]
+            res.append(ser.data[ser.view])
+        return res
+
+    def take(self, positions, axis=0):
+        """
+        Copies rows, or columns for axis=1, by position, in the given order
+        :param positions: iterable of ints
+        :param axis: int, 0 for rows, 1 for columns
+        :return: DataFrame
+        """
+        positions = list(positions)
         if axis == 0:
-            cp = cp.transpose()
-        return cp
+            return self.from_blocks(
+                [take(block, positions) for block in self.view_blocks()],
+                self.index.take(positions),
+                self.columns,
+            )
+        cols = range(len(self.data.blocks))[self.view[1]]
+        blocks = self.data.blocks
+        rows = self.view[0]
+        return self.from_blocks(
+            [blocks[cols[pos]][rows] for pos in positions],
+            self.index,
+            self.columns.take(positions),
+        )
+
+    def to_csv(
+        self,
+        path_or_buf=None,
+        sep=",",
+        na_rep="",
+        columns=None,
+        header=True,
+        index=True,
+        chunksize=None,
+        compression="infer",
+    ):
+        """
+        Writes to a CSV file, straight from the columns, without building a
+        list per row
+
+        :param path_or_buf: str, path or file object. If None, returns a str
+        :param sep: str, delimiter
+        :param na_rep: str, written for nan
+        :param columns: list of column labels to write
+        :param header: bool, or list of str to write instead of the labels
+        :param index: bool, write the index as the first column
+        :param chunksize: int, number of rows written at a time
+        :param compression: str, 'gzip', 'bz2', 'xz' or 'zip', 'infer' to go by
+        the file extension, or None
+        :return: str if path_or_buf is None
+        """
+        # ugly, but necessary :/
+        from .io import to_csv
+
+        return to_csv(
+            self,
+            path_or_buf,
+            sep,
+            na_rep,
+            columns,
+            header,
+            index,
+            chunksize,
+            compression,
+        )
+
+    def to_json(
+        self, path_or_buf=None, orient="columns", lines=False, compression="infer"
+    ):
+        """
+        Writes to a JSON file, serializing one column at a time, without
+        building a dict per row
+
+        :param path_or_buf: str, path or file object. If None, returns a str
+        :param orient: str, 'records' for a list of objects, one per row, or
+        'columns' for an object of column label -> object of index label -> value
+        :param lines: bool, with orient='records', write one object per line
+        :param compression: str, 'gzip', 'bz2', 'xz' or 'zip', 'infer' to go by
+        the file extension, or None
+        :return: str if path_or_buf is None
+        """
+        # ugly, but necessary :/
+        from .io import to_json
+
+        return to_json(self, path_or_buf, orient, lines, compression)
+
+    def to_pam(self, path):
+        """
+        Writes to a pam file, a binary columnar format that read_pam loads
+        without parsing. Int, float and bool columns are stored as raw array
+        bytes and strs as offsets and UTF-8 bytes. See pam.py.
+
+        :param path: str or path
+        """
+        # ugly, but necessary :/
+        from .pam import to_pam
+
+        to_pam(self, path)
+
+    def to_shared(self, name=None):
+        """
+        Copies to a block of shared memory, laid out like a pam file. Worker
+        processes read it back with pambdas.attach_shared(shm.name) without
+        anything being pickled. Needs Python 3.8 or newer.
+
+        :param name: str, name of the block, defaults to a random one
+        :return: multiprocessing.shared_memory.SharedMemory. Keep it until the
+        workers are done, then call its close and unlink.
+        """
+        # ugly, but necessary :/
+        from .pam import to_shared
+
+        return to_shared(self, name)
 
     def reset_index(self, drop=False):
         cp = self.copy()
         if not drop:
             cp["index"] = cp.index
             cp = cp.loc[:, cp.columns[-1:] + cp.columns[:-1]]
-        cp.index = tuple(i for i in range(len(self)))
+        cp.index = RangeIndex(len(self))
 
         return cp
 
-    def groupby(self, by):
+    def groupby(self, by, as_index=True):
         """
-        Simple groupby implementation
+        Groups the rows by the values of a column
+        :param by: column label, or list of labels to group by their tuple
+        :param as_index: bool, index results by key, otherwise return the keys
+        as columns
+        :return: GroupBy
         """
-        gb = GroupBy()
+        return GroupBy(self, by, as_index)
 
-        for item in self[by].unique():
-            df = self.loc[self[by] == item, :]
-            df.name = item
-            df.drop(by)
-            gb.dfs.append(df)
-        return gb
+    def merge(
+        self,
+        right,
+        how="inner",
+        on=None,
+        left_on=None,
+        right_on=None,
+        suffixes=("_x", "_y"),
+    ):
+        """
+        Joins with another DataFrame on the values of one or more columns.
+        See pambdas.merge
+        """
+        return merge(self, right, how, on, left_on, right_on, suffixes)
 
     def mean(self, axis=0, dropna=True):
         return self.apply(lambda x: sum(x) / len(x), axis=axis, dropna=dropna)
@@ -603,75 +921,10 @@ class DataFrame:
         return res
 
 
-class GroupBy:
-    """
-    GroupBy class for DataFrame
-    """
-
-    def __init__(self):
-        """
-        Collection of DataFrames
-        """
-        self.dfs = []
-
-    def apply(self, func, axis=0, dropna=True):
-        """
-        Applies a method
-        """
-        res_ser = []
-        for df in self.dfs:
-            res_ser.append(df.apply(func, axis=axis, dropna=dropna))
-        return DataFrame(res_ser)
-
-    def __sum__(self):
-        pass
-
-    def __getattr__(self, item):
-        """
-        Returns a method containing a for loop of partialized
-        methods, awaiting *args and **kwargs
-        """
-        return functools.partial(self.loop_func, method_name=item)
-
-    def loop_func(self, method_name, *args, **kwargs):
-        """
-        The function to be executed with args and kwargs
-        """
-        res_ser = []
-        for df in self.dfs:
-            res_ser.append(df.__getattribute__(method_name)(*args, **kwargs))
-        return DataFrame(res_ser)
-
-
-def read_csv(filepath, sep=",", header=0, names=None, index_col=None):
+def copy_column(values):
     """
-    Reads CSV file into dataframe
+    Copies the values of a column into a list, or an array if they are an array
     """
-    # see if there is an fspath
-    try:
-        filepath = filepath.__fspath__()
-    except:
-        pass
-    index = []
-    columns = []
-    data = []
-    if names is not None:
-        header = None
-        columns = names
-    with open(filepath) as csvfile:
-        spamreader = csv.reader(csvfile, delimiter=sep)
-        for i, row in enumerate(spamreader):
-            if isinstance(header, int) and header == i:
-                if isinstance(index_col, int):
-                    columns = row[:index_col] + row[index_col + 1 :]
-                else:
-                    columns = row
-                continue
-
-            if isinstance(index_col, int):
-                index.append(row[index_col])
-                data.append(row[:index_col] + row[index_col + 1 :])
-            else:
-                data.append(row)
-
-    return DataFrame(data, columns=columns, index=index)
+    if isinstance(values, (list, array)):
+        return values[:]
+    return list(values)
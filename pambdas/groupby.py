@@ -0,0 +1,303 @@
+"""
+Contains the GroupBy class
+"""
+from collections import defaultdict
+import functools
+import operator
+from .index import Index, RangeIndex
+from .other_stuff import nan, row_keys, top_positions
+from .series import Series
+from .storage import is_typed, take
+
+
+def mean(values):
+    return sum(values) / len(values)
+
+
+def var(values, ddof=1):
+    """
+    Sample variance
+    """
+    if len(values) <= ddof:
+        return nan
+    avg = sum(values) / len(values)
+    return sum([(val - avg) * (val - avg) for val in values]) / (len(values) - ddof)
+
+
+def std(values, ddof=1):
+    res = var(values, ddof)
+    return nan if res is nan else res ** 0.5
+
+
+# name -> function reducing a list of values, used by GroupBy.agg
+AGGREGATIONS = {
+    "count": len,
+    "sum": sum,
+    "mean": mean,
+    "min": min,
+    "max": max,
+    "var": var,
+    "std": std,
+    "first": operator.itemgetter(0),
+    "last": operator.itemgetter(-1),
+}
+
+
+class GroupBy:
+    """
+    GroupBy class for DataFrame
+
+    Groups are found in a single pass over the key column(s), which records the
+    row positions of each key. Grouping by a list of columns hashes the tuple of
+    each row's keys. Group DataFrames are only built when asked for
+    (get_group, iteration), and aggregations take the values of each column
+    straight from those positions.
+
+    groups: dict of key -> list of row positions, in order of first appearance.
+    Rows with a nan key are left out.
+    """
+
+    def __init__(self, obj, by, as_index=True):
+        """
+        :param obj: DataFrame to group
+        :param by: label of the column holding the keys, or a list of labels
+        :param as_index: bool, index results by key. Otherwise the keys are
+        returned as columns and results get a default index.
+        """
+        self.obj = obj
+        self.by = by
+        self.as_index = as_index
+        self.key_labels = list(by) if isinstance(by, list) else [by]
+        self.key_cols = [obj.columns.get_loc(label) for label in self.key_labels]
+        self.value_cols = [i for i in range(len(obj.columns)) if i not in self.key_cols]
+
+        keys = [obj.iloc[:, col] for col in self.key_cols]
+        keys = [ser.data[ser.view] for ser in keys]
+        keys = zip(*keys) if isinstance(by, list) else keys[0]
+        groups = defaultdict(list)
+        for i, key in enumerate(keys):
+            try:
+                groups[key].append(i)
+            except TypeError:
+                # nan isn't hashable
+                if not (key is nan or isinstance(key, tuple) and nan in key):
+                    raise
+        self.groups = dict(groups)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        for key in self.groups:
+            yield key, self.get_group(key)
+
+    @property
+    def keys(self):
+        return Index(self.groups)
+
+    def get_group(self, name):
+        """
+        Builds the DataFrame of one group, without the key columns
+        :param name: key of the group, a tuple when grouping by a list
+        :return: DataFrame
+        """
+        df = self.obj.iloc[self.groups[name], self.value_cols]
+        df.name = name
+        return df
+
+    def iter_values(self):
+        """
+        Yields the label and viewed values of each column that isn't a key
+        """
+        labels = self.obj.columns
+        for i, values in enumerate(self.obj.view_blocks()):
+            if i not in self.key_cols:
+                yield labels[i], values
+
+    def result(self, blocks, labels):
+        """
+        Builds the DataFrame of aggregated columns, with one row per group
+        :param blocks: list of lists, one value per group
+        :param labels: list of column labels
+        :return: DataFrame
+        """
+        if self.as_index:
+            return self.obj.from_blocks(blocks, self.keys, labels)
+        keys = list(self.groups)
+        if isinstance(self.by, list):
+            key_blocks = [list(col) for col in zip(*keys)]
+            key_blocks = key_blocks or [[] for _ in self.key_labels]
+        else:
+            key_blocks = [keys]
+        return self.obj.from_blocks(
+            key_blocks + blocks, RangeIndex(len(keys)), self.key_labels + labels
+        )
+
+    def agg(self, func, dropna=True):
+        """
+        Aggregates each group. Every aggregate of a column is computed from a
+        single gather of that column's values for each group. Only one group's
+        values are held at a time, and reducing them with the built-in sum,
+        min and max runs in C, which is faster than updating accumulators in
+        Python for every row.
+
+        agg("sum") or agg(["sum", "mean"]) aggregates every column that isn't
+        the key, leaving out columns the aggregate can't be applied to.
+        agg({"col": "sum", "other": ["min", "max"]}) picks aggregates per
+        column. A list of aggregates makes one column per aggregate, labeled
+        (column, aggregate).
+
+        :param func: str or function, list of them, or dict of column label ->
+        str, function or list. Strings are the names in AGGREGATIONS, functions
+        take a list of values.
+        :param dropna: bool, leave out nans before aggregating
+        :return: DataFrame, indexed by key
+        """
+        if isinstance(func, dict):
+            spec = func
+        else:
+            spec = {
+                label: func
+                for label in self.obj.columns
+                if label not in self.key_labels
+            }
+        groups = list(self.groups.values())
+        labels = []
+        blocks = []
+        for label, names in spec.items():
+            values = self.obj.column_values(label)[0]
+            many = isinstance(names, list)
+            if not many:
+                names = [names]
+            funcs = [AGGREGATIONS[f] if isinstance(f, str) else f for f in names]
+            results = [[] for _ in funcs]
+            skip_nan = dropna and not is_typed(values)
+            getter = values.__getitem__
+            try:
+                for positions in groups:
+                    group = list(map(getter, positions))
+                    if skip_nan:
+                        group = [val for val in group if val is not nan]
+                    for res, f in zip(results, funcs):
+                        if group:
+                            res.append(f(group))
+                        else:
+                            res.append(0 if f is len else nan)
+            except TypeError:
+                if isinstance(func, dict):
+                    raise
+                continue
+            if many:
+                labels.extend(
+                    (label, f if isinstance(f, str) else f.__name__) for f in names
+                )
+            else:
+                labels.append(label)
+            blocks.extend(results)
+        return self.result(blocks, labels)
+
+    aggregate = agg
+
+    def count(self):
+        return self.agg("count")
+
+    def sum(self, dropna=True):
+        return self.agg("sum", dropna)
+
+    def mean(self, dropna=True):
+        return self.agg("mean", dropna)
+
+    def min(self, dropna=True):
+        return self.agg("min", dropna)
+
+    def max(self, dropna=True):
+        return self.agg("max", dropna)
+
+    def var(self, dropna=True):
+        return self.agg("var", dropna)
+
+    def std(self, dropna=True):
+        return self.agg("std", dropna)
+
+    def first(self, dropna=True):
+        return self.agg("first", dropna)
+
+    def last(self, dropna=True):
+        return self.agg("last", dropna)
+
+    def nlargest(self, n, columns):
+        """
+        Returns the n rows of each group with the largest values
+        :param n: int
+        :param columns: label, or list of labels compared in order
+        :return: DataFrame, the rows of each group in turn, from the largest
+        """
+        return self.top(n, columns, True)
+
+    def nsmallest(self, n, columns):
+        """
+        Returns the n rows of each group with the smallest values
+        :param n: int
+        :param columns: label, or list of labels compared in order
+        :return: DataFrame, the rows of each group in turn, from the smallest
+        """
+        return self.top(n, columns, False)
+
+    def top(self, n, columns, largest):
+        values = self.obj.column_values(columns)
+        # built once, not per group
+        keys = row_keys(values)
+        positions = []
+        for group in self.groups.values():
+            positions.extend(top_positions(values, n, largest, group, keys))
+        return self.obj.take(positions)
+
+    def apply(self, func, axis=0, dropna=True):
+        """
+        Applies a reducing function to each column of each group. Columns
+        the function can't be applied to are left out.
+        :param func: function taking a Series and returning a single value
+        :param axis: int, 1 applies func to the rows of each group instead
+        :param dropna: bool, drop nans before applying func
+        :return: DataFrame, indexed by key
+        """
+        if axis != 0:
+            return self.loop_func("apply", func, axis=axis, dropna=dropna)
+        index = self.obj.index
+        labels = []
+        blocks = []
+        for label, values in self.iter_values():
+            res = []
+            try:
+                for positions in self.groups.values():
+                    ser = Series.from_data(
+                        take(values, positions),
+                        index.take(positions),
+                        label,
+                        slice(0, len(positions), 1),
+                    )
+                    if dropna:
+                        ser = ser.dropna()
+                    # if it was all nans, just put a nan there
+                    res.append(nan if len(ser) == 0 else func(ser))
+            except TypeError:
+                continue
+            labels.append(label)
+            blocks.append(res)
+        return self.result(blocks, labels)
+
+    def __getattr__(self, item):
+        """
+        Returns a method containing a for loop of partialized
+        methods, awaiting *args and **kwargs
+        """
+        return functools.partial(self.loop_func, item)
+
+    def loop_func(self, method_name, *args, **kwargs):
+        """
+        Calls a DataFrame method on each group, building the groups as it goes
+        """
+        res_ser = []
+        for key, df in self:
+            res_ser.append(getattr(df, method_name)(*args, **kwargs))
+        return self.obj.class_init(res_ser)
@@ -0,0 +1,301 @@
+"""
+Contains the Index class used for row and column labels
+"""
+from itertools import repeat
+
+
+class Index(tuple):
+    """
+    An immutable tuple of labels that can find the position of a label in O(1).
+
+    The label -> position map is built lazily on the first lookup and cached.
+    Slicing an Index returns a child that shares its parent's map, so views
+    produced by .iloc don't rebuild it. If the labels are unhashable, lookups
+    fall back to a linear scan.
+    """
+
+    def __new__(cls, labels=()):
+        self = super().__new__(cls, labels)
+        self._positions = None  # label -> first position, False if unhashable
+        self._parent = None  # root Index this one was sliced from
+        self._offset = 0  # position of our first label in the parent
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (tuple(self),)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._slice(key)
+        return tuple.__getitem__(self, key)
+
+    def __add__(self, other):
+        return Index(tuple(self) + tuple(other))
+
+    def __radd__(self, other):
+        return Index(tuple(other) + tuple(self))
+
+    def __contains__(self, label):
+        try:
+            self.get_loc(label)
+        except KeyError:
+            return False
+        return True
+
+    def append(self, label):
+        """
+        Returns a new Index with a label added at the end. The label map is
+        handed over to the new Index and extended rather than rebuilt, so
+        adding rows one at a time stays linear.
+        :param label: any label
+        :return: Index
+        """
+        res = Index(tuple.__add__(self, (label,)))
+        positions = self._positions
+        if positions:
+            try:
+                positions.setdefault(label, len(self))
+            except TypeError:
+                positions = False
+            res._positions = positions
+            # the map no longer matches our labels, rebuild it if we're used
+            self._positions = None
+        return res
+
+    def take(self, positions):
+        """
+        Returns a new Index of the labels at the given positions
+        :param positions: iterable of int
+        :return: Index
+        """
+        return Index(map(tuple.__getitem__, repeat(self), positions))
+
+    def _slice(self, key):
+        """
+        Slices the index. Contiguous slices keep a reference to the root
+        Index so the label map can be shared.
+        """
+        child = Index(tuple.__getitem__(self, key))
+        if key.step is None or key.step == 1:
+            start = key.indices(len(self))[0]
+            if self._parent is not None:
+                child._parent = self._parent
+                child._offset = self._offset + start
+            else:
+                child._parent = self
+                child._offset = start
+        return child
+
+    @property
+    def positions(self):
+        """
+        dict of label -> position of its first occurrence, or None if the
+        labels are unhashable
+        """
+        if self._positions is None:
+            try:
+                # iterate backwards so the first occurrence wins
+                self._positions = dict(
+                    zip(reversed(self), range(len(self) - 1, -1, -1))
+                )
+            except TypeError:
+                self._positions = False
+        if self._positions is False:
+            return None
+        return self._positions
+
+    @property
+    def is_unique(self):
+        positions = self.positions
+        if positions is None:
+            return all(tuple.count(self, label) == 1 for label in self)
+        return len(positions) == len(self)
+
+    def get_loc(self, label):
+        """
+        Returns the position of the first occurrence of a label
+        :param label: any label
+        :return: int
+        :raises KeyError: if the label is not in the index
+        """
+        parent = self._parent
+        if parent is not None and parent.positions is not None and parent.is_unique:
+            pos = parent.get_loc(label) - self._offset
+            if 0 <= pos < len(self):
+                return pos
+            raise KeyError(label)
+
+        positions = self.positions
+        if positions is not None:
+            try:
+                return positions[label]
+            except TypeError:
+                pass
+        try:
+            return tuple.index(self, label)
+        except ValueError:
+            raise KeyError(label)
+
+
+class RangeIndex(Index):
+    """
+    An Index of evenly spaced integers, i.e. the default index.
+
+    Only start, stop and step are stored. Lookups, slicing and len are answered
+    arithmetically, and the labels are only materialized into a plain Index
+    when it is combined with other labels. The tuple it subclasses is left
+    empty, so code reading the labels has to iterate it, e.g. list(index),
+    rather than rely on C code reading tuple storage.
+    """
+
+    def __new__(cls, start=0, stop=None, step=1):
+        if stop is None:
+            start, stop = 0, start
+        self = tuple.__new__(cls)
+        self._range = range(start, stop, step)
+        self._positions = None
+        self._parent = None
+        self._offset = 0
+        return self
+
+    @classmethod
+    def from_range(cls, rng):
+        return cls(rng.start, rng.stop, rng.step)
+
+    @property
+    def start(self):
+        return self._range.start
+
+    @property
+    def stop(self):
+        return self._range.stop
+
+    @property
+    def step(self):
+        return self._range.step
+
+    def __reduce__(self):
+        return self.__class__, (self.start, self.stop, self.step)
+
+    def __len__(self):
+        return len(self._range)
+
+    def __iter__(self):
+        return iter(self._range)
+
+    def __reversed__(self):
+        return reversed(self._range)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.from_range(self._range[key])
+        return self._range[key]
+
+    def __contains__(self, label):
+        try:
+            self.get_loc(label)
+        except KeyError:
+            return False
+        return True
+
+    def __eq__(self, other):
+        if isinstance(other, RangeIndex):
+            return self._range == other._range
+        if isinstance(other, tuple):
+            return len(self) == len(other) and tuple(self._range) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        if res is NotImplemented:
+            return res
+        return not res
+
+    def __hash__(self):
+        return hash(tuple(self._range))
+
+    def __lt__(self, other):
+        return tuple(self._range) < tuple(other)
+
+    def __le__(self, other):
+        return tuple(self._range) <= tuple(other)
+
+    def __gt__(self, other):
+        return tuple(self._range) > tuple(other)
+
+    def __ge__(self, other):
+        return tuple(self._range) >= tuple(other)
+
+    def __repr__(self):
+        return repr(tuple(self._range))
+
+    def __add__(self, other):
+        # appending the next integer(s) in the sequence keeps it a range
+        following = self.start + len(self) * self.step
+        if isinstance(other, RangeIndex):
+            if len(other) == 0:
+                return self
+            if other.start == following and (
+                other.step == self.step or len(other) == 1
+            ):
+                return RangeIndex(
+                    self.start, following + len(other) * self.step, self.step
+                )
+        elif isinstance(other, tuple) and len(other) == 1 and other[0] == following:
+            if type(other[0]) is int:
+                return RangeIndex(self.start, following + self.step, self.step)
+        return Index(tuple(self._range) + tuple(other))
+
+    def __radd__(self, other):
+        return Index(tuple(other) + tuple(self._range))
+
+    def append(self, label):
+        return self + (label,)
+
+    def __mul__(self, other):
+        return Index(tuple(self._range) * other)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    @property
+    def positions(self):
+        return None
+
+    @property
+    def is_unique(self):
+        return True
+
+    def take(self, positions):
+        return Index(map(self._range.__getitem__, positions))
+
+    def index(self, label, *args):
+        return self._range.index(label, *args)
+
+    def count(self, label):
+        return self._range.count(label)
+
+    def get_loc(self, label):
+        """
+        Returns the position of a label, computed from start and step
+        :param label: int
+        :return: int
+        :raises KeyError: if the label is not in the index
+        """
+        if isinstance(label, float) and label.is_integer():
+            label = int(label)
+        if not isinstance(label, int):
+            raise KeyError(label)
+        try:
+            return self._range.index(label)
+        except ValueError:
+            raise KeyError(label)
+
+
+def ensure_index(labels):
+    """
+    Converts an iterable of labels into an Index, passing None and Indexes through
+    """
+    if labels is None or isinstance(labels, Index):
+        return labels
+    return Index(labels)
@@ -1,10 +1,13 @@
 """
 Contains the .loc and .iloc indexers for both DataFrames and Series
 """
+from array import array
 from copy import copy
 import itertools
 
-from .other_stuff import is_bool, is_2d_bool, nan, invert
+from .blocks import BlockManager
+from .other_stuff import is_bool, is_2d_bool, nan, invert, bool_positions
+from .storage import set_slice, set_value, take, to_list
 
 
 class ILocDF:
@@ -26,11 +29,13 @@ class ILocDF:
         Getitem for DataFrames based on index number
         """
         data = self.obj.data
+        blocks = data.blocks
         index = self.obj.index
         columns = self.obj.columns
         step = self.obj.step
         view = self.obj.view
         name = None
+        owner = None
         # if it's a tuple, its multiple indicies. Otherwise, its one item, so
         # make a dummy index
         if isinstance(items, tuple):
@@ -43,6 +48,8 @@ class ILocDF:
                 items[0] = items[0].values
 
             df_cp = self.obj.copy()
+            # nan can't be stored in an array
+            df_cp.data.blocks = [to_list(block) for block in df_cp.data.blocks]
             df_cp[invert(items[0])] = nan
             return df_cp
         data_items = copy(items)
@@ -52,7 +59,7 @@ class ILocDF:
             if isinstance(item, self.obj.ITERABLE_1D):
                 # if it's a boolean
                 if is_bool(item):
-                    items[i] = [i for i, val in enumerate(item) if val]
+                    items[i] = bool_positions(item)
                 data_items[i] = self.obj.bound_iterable_to_df(items[i], axis=i)
 
             elif isinstance(item, slice):
@@ -66,21 +73,21 @@ class ILocDF:
         #################
         if isinstance(items[0], int) and isinstance(items[1], int):
             # eg [1, 0]
-            return data[data_items[0] + step * data_items[1]]
+            return blocks[data_items[1]][data_items[0]]
         ##################
         # Returns a Series
         ##################
         if isinstance(items[0], slice) and isinstance(items[1], int):
             # eg [1:3, 0]
+            # shares the column
             index = index[items[0]]
             name = columns[items[1]]
-            view = slice(
-                data_items[0].start + data_items[1] * step,
-                data_items[0].stop + data_items[1] * step,
-                1,
-            )
+            data = blocks[data_items[1]]
+            view = slice(data_items[0].start, data_items[0].stop, 1)
+            owner = (self.obj.data, data_items[1])
         elif isinstance(items[0], int) and isinstance(items[1], slice):
             # eg .iloc[0, 1:3]
+            # a strided view through the flat addressing of the BlockManager
             name = index[items[0]]
             index = columns[items[1]]
             start = data_items[0] + step * data_items[1].start
@@ -89,15 +96,15 @@ class ILocDF:
         elif isinstance(items[0], int) and isinstance(items[1], self.obj.ITERABLE_1D):
             # eg .iloc[0, [1, 2, 3]]
             name = index[items[0]]
-            index = tuple(columns[i] for i in items[1])
-            data = [data[data_items[0] + step * i] for i in data_items[1]]
+            index = columns.take(items[1])
+            data = [blocks[i][data_items[0]] for i in data_items[1]]
             # returns a copy of the data, so index starts at zero
             view = slice(0, len(items[1]))
         elif isinstance(items[0], self.obj.ITERABLE_1D) and isinstance(items[1], int):
             # eg .iloc[[1, 2, 3], 0]
             name = columns[items[1]]
-            index = tuple(index[i] for i in items[0])
-            data = [data[i + step * data_items[i][1]] for i in data_items[i][0]]
+            index = index.take(items[0])
+            data = take(blocks[data_items[1]], data_items[0])
             view = slice(0, len(items[0]))
 
         #####################
@@ -110,45 +117,42 @@ class ILocDF:
             view = tuple(data_items)
         elif isinstance(items[0], self.obj.ITERABLE_1D) and isinstance(items[1], slice):
             # e.g. .iloc[[1, 2], :]
-            # iterate through row
-            ndata = []
-            for col_index in range(data_items[1].start, data_items[1].stop):
-                ndata.extend([data[i + col_index * step] for i in data_items[0]])
-            data = ndata
+            data = BlockManager(
+                [take(block, data_items[0]) for block in blocks[data_items[1]]],
+                len(data_items[0]),
+            )
             name = columns[items[1]]
-            index = tuple(index[i] for i in items[0])
+            index = index.take(items[0])
             step = len(index)
             # retuns a copy, so view starts at zero
             view = (slice(0, step), slice(0, len(name)))
         elif isinstance(items[0], slice) and isinstance(items[1], self.obj.ITERABLE_1D):
             # e.g. .iloc[:, [1,2]
-            ndata = []
-            for i in data_items[1]:
-                ndata.extend(
-                    data[data_items[0].start + i * step : data_items[0].stop + i * step]
-                )
-            data = ndata
+            data = BlockManager(
+                [blocks[i][data_items[0]] for i in data_items[1]],
+                len(range(data.step)[data_items[0]]),
+            )
             index = index[items[0]]
-            name = tuple(columns[i] for i in items[1])
+            name = columns.take(items[1])
             step = len(index)
-            # return a copy, view starts at zero
+            # returns a copy, like a list of rows, so view starts at zero
             view = (slice(0, step), slice(0, len(name)))
         elif isinstance(items[0], self.obj.ITERABLE_1D) and isinstance(
             items[1], self.obj.ITERABLE_1D
         ):
-            # e.g. .iloc[:, [1,2]
-            ndata = []
-            for i in data_items[1]:
-                ndata.extend([data[j + i * step] for j in data_items[0]])
-            data = ndata
-            index = tuple(index[i] for i in items[0])
-            name = tuple(columns[i] for i in items[1])
+            # e.g. .iloc[[1, 2], [1,2]
+            data = BlockManager(
+                [take(blocks[i], data_items[0]) for i in data_items[1]],
+                len(data_items[0]),
+            )
+            index = index.take(items[0])
+            name = columns.take(items[1])
             step = len(index)
             # return a copy, view starts at zero
             view = (slice(0, step), slice(0, len(name)))
 
         if isinstance(index, tuple) and isinstance(name, (str, int)):
-            return self.obj.series_from_data(data, index, name, view)
+            return self.obj.series_from_data(data, index, name, view, owner)
         if isinstance(index, tuple) and isinstance(name, tuple):
             return self.obj.from_data(data, index, name, view, step)
         raise IndexError(
@@ -159,8 +163,7 @@ class ILocDF:
         """
         Setitem for DataFrames based on index number
         """
-        data = self.obj.data
-        step = self.obj.step
+        blocks = self.obj.data.blocks
 
         # if it's a tuple, its multiple indicies. Otherwise, make a dummy index
         if isinstance(items, tuple):
@@ -177,7 +180,7 @@ class ILocDF:
             elif isinstance(item, self.obj.ITERABLE_1D):
                 # if it's a boolean
                 if is_bool(item):
-                    items[i] = [i for i, val in enumerate(item) if val]
+                    items[i] = bool_positions(item)
                 data_items[i] = self.obj.bound_iterable_to_df(items[i], axis=i)
             elif isinstance(item, slice):
                 items[i] = self.obj.convert_slice(item, axis=i)
@@ -192,7 +195,8 @@ class ILocDF:
         #################
         if isinstance(data_items[0], int) and isinstance(data_items[1], int):
             # eg [1, 0]
-            data[data_items[0] + step * data_items[1]] = value
+            j = data_items[1]
+            blocks[j] = set_value(blocks[j], data_items[0], value)
         ##################
         # Sets a 1D section
         ##################
@@ -204,32 +208,27 @@ class ILocDF:
                 value = value[list(self.obj.index)]
             except TypeError:
                 pass
-            data[
-                data_items[0].start
-                + step * data_items[1] : data_items[0].stop
-                + data_items[1] * step
-            ] = value
+            j = data_items[1]
+            blocks[j] = set_slice(blocks[j], data_items[0], value)
 
         if isinstance(data_items[0], int) and isinstance(data_items[1], slice):
             # eg .iloc[0, 1:3]
-            start = data_items[0] + step * data_items[1].start
-            stop = data_items[0] + step * data_items[1].stop
             if not isinstance(value, self.obj.ITERABLE_1D):
                 value = [value] * (data_items[1].stop - data_items[1].start)
             try:
                 value = value[list(self.obj.columns)]
             except TypeError:
                 pass
-            for i, val in zip(range(start, stop, step), value):
-                data[i] = val
+            for j, val in zip(range(len(blocks))[data_items[1]], value):
+                blocks[j] = set_value(blocks[j], data_items[0], val)
         if isinstance(data_items[0], int) and isinstance(
             data_items[1], self.obj.ITERABLE_1D
         ):
             # eg .iloc[0, [1, 2, 3]]
             if not isinstance(value, self.obj.ITERABLE_1D):
                 value = [value] * (len(data_items[1]))
-            for i, val in zip(items[1], value):
-                data[data_items[0] + step * i] = val
+            for j, val in zip(data_items[1], value):
+                blocks[j] = set_value(blocks[j], data_items[0], val)
 
         if isinstance(data_items[0], self.obj.ITERABLE_1D) and isinstance(
             data_items[1], int
@@ -237,8 +236,9 @@ class ILocDF:
             # eg .iloc[[1, 2, 3], 0]
             if not isinstance(value, self.obj.ITERABLE_1D):
                 value = [value] * (len(data_items[0]))
+            j = data_items[1]
             for i, val in zip(data_items[0], value):
-                data[i + step * data_items[1]] = val
+                blocks[j] = set_value(blocks[j], i, val)
 
         #####################
         # Sets a 2D section
@@ -261,7 +261,7 @@ class ILocDF:
 
             for i in range(data_items[0].start, data_items[0].stop):
                 for j in range(data_items[1].start, data_items[1].stop):
-                    data[i + j * step] = value[k]
+                    blocks[j] = set_value(blocks[j], i, value[k])
                     k += 1
 
         # handle a 2d boolean key
@@ -274,10 +274,10 @@ class ILocDF:
             for i, row in enumerate(data_items[0]):
                 for j, col in enumerate(row):
                     if col:
-                        self.obj.data[
-                            self.obj.bound_int_to_df(i, axis=0)
-                            + self.obj.bound_int_to_df(j, axis=1) * self.obj.step
-                        ] = value
+                        col = self.obj.bound_int_to_df(j, axis=1)
+                        blocks[col] = set_value(
+                            blocks[col], self.obj.bound_int_to_df(i, axis=0), value
+                        )
 
         elif isinstance(data_items[0], self.obj.ITERABLE_1D) and isinstance(
             data_items[1], slice
@@ -294,7 +294,7 @@ class ILocDF:
 
             for i in data_items[0]:
                 for j in range(data_items[1].start, data_items[1].stop):
-                    data[i + j * step] = value[k]
+                    blocks[j] = set_value(blocks[j], i, value[k])
                     k += 1
         if isinstance(data_items[0], slice) and isinstance(
             data_items[1], self.obj.ITERABLE_1D
@@ -310,7 +310,7 @@ class ILocDF:
 
             for i in range(data_items[0].start, data_items[0].stop):
                 for j in data_items[1]:
-                    data[i + j * step] = value[k]
+                    blocks[j] = set_value(blocks[j], i, value[k])
                     k += 1
         if isinstance(data_items[0], self.obj.ITERABLE_1D) and isinstance(
             data_items[1], self.obj.ITERABLE_1D
@@ -323,7 +323,7 @@ class ILocDF:
                 value = [value] * (len(data_items[0]) * len(data_items[1]))
             for i in data_items[0]:
                 for j in data_items[1]:
-                    data[i + j * step] = value[k]
+                    blocks[j] = set_value(blocks[j], i, value[k])
                     k += 1
 
 
@@ -332,7 +332,7 @@ class ILocSer:
     ILoc indexer for Series
     """
 
-    ITERABLE_1D = (list, set, tuple)
+    ITERABLE_1D = (list, set, tuple, array)
 
     def __init__(self, obj):
         """
@@ -352,19 +352,29 @@ class ILocSer:
             )
             view = self.obj.bound_slice(item)
             index = self.obj.index[item]
-            return self.obj.from_data(self.obj.data, index, self.obj.name, view)
+            return self.obj.from_data(
+                self.obj.data, index, self.obj.name, view, self.obj.owner
+            )
 
         if isinstance(item, self.ITERABLE_1D + (self.obj.__class__,)):
             if is_bool(item):
-                item = [i for i, val in enumerate(item) if val]
-
-            index = self.obj.index
-            index = [index[i] if i is not None else None for i in item]
-            data = self.obj.values
-            data = [data[i] if i is not None else nan for i in item]
+                item = bool_positions(item)
+                index = self.obj.index.take(item)
+                data = take(self.obj.data[self.obj.view], item)
+            else:
+                # positions can be None for labels that weren't found
+                index = self.obj.index
+                index = [index[i] if i is not None else None for i in item]
+                data = self.obj.values
+                data = [data[i] if i is not None else nan for i in item]
             view = slice(0, len(index), 1)
             return self.obj.from_data(data, index, self.obj.name, view)
-        return self.obj.values[item]
+        if item >= len(self.obj) or item < -len(self.obj):
+            raise IndexError(
+                "You requested index %s but series is only %s items."
+                % (item, len(self.obj))
+            )
+        return self.obj.data[self.obj.bound_int(item)]
 
     def __setitem__(self, item, value):
         """
@@ -374,13 +384,13 @@ class ILocSer:
         if isinstance(item, self.ITERABLE_1D + (self.obj.__class__,)):
             # if it's a boolean
             if is_bool(item):
-                item = [i for i, val in enumerate(item) if val]
+                item = bool_positions(item)
             data_item = self.obj.bound_iterable(item)
             if not isinstance(value, self.ITERABLE_1D + (self.obj.__class__,)):
                 value = [value] * len(self.obj)
 
             for i, val in zip(data_item, value):
-                self.obj.data[i] = val
+                self.obj.replace_storage(set_value(self.obj.data, i, val))
 
         elif isinstance(item, slice):
             item = slice(
@@ -391,7 +401,7 @@ class ILocSer:
             if not isinstance(value, self.ITERABLE_1D + (self.obj.__class__,)):
                 value = [value] * ((data_item.stop - data_item.start) // data_item.step)
 
-            self.obj.data[data_item] = value
+            self.obj.replace_storage(set_slice(self.obj.data, data_item, value))
 
         else:
             # check the bounds
@@ -401,7 +411,7 @@ class ILocSer:
                     % (item, len(self.obj))
                 )
             data_item = self.obj.bound_int(item)
-            self.obj.data[data_item] = value
+            self.obj.replace_storage(set_value(self.obj.data, data_item, value))
 
 
 class LocSer:
@@ -409,7 +419,7 @@ class LocSer:
     Loc indexer for Series
     """
 
-    ITERABLE_1D = (list, set, tuple)
+    ITERABLE_1D = (list, set, tuple, array)
 
     def __init__(self, obj):
         """
@@ -451,7 +461,7 @@ class LocDF:
     Loc indexer for DataFrames
     """
 
-    ITERABLE_1D = (list, set, tuple)
+    ITERABLE_1D = (list, set, tuple, array)
 
     def __init__(self, obj):
         """
@@ -504,8 +514,7 @@ class LocDF:
 
         # if the index isn't found, add an empty row/column and call it again
         if iloc_items[0] is None:
-            # adding a row will break the view. Make a copy.
-            self.obj.drop()
+            # add_empty_series makes a copy if the view can't grow in place
             self.obj.add_empty_series(items[0], axis=0)
             self.__setitem__(items, value)
         elif len(items) > 1 and iloc_items[1] is None:
@@ -0,0 +1,1168 @@
+"""
+Contains the readers and writers for files
+"""
+import bz2
+import csv
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import gzip
+import io
+import json
+import locale
+from json.encoder import encode_basestring_ascii
+from itertools import islice, repeat, zip_longest
+import lzma
+import mmap
+import operator
+import os.path
+import pickle
+import zipfile
+from .dataframe import DataFrame
+from .index import RangeIndex
+from .other_stuff import nan
+from .storage import TYPECODES, concat_values, to_typed
+
+# strings read as nan
+NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#NA",
+        "-NaN",
+        "-nan",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+BOOL_VALUES = {
+    "True": True,
+    "true": True,
+    "TRUE": True,
+    "False": False,
+    "false": False,
+    "FALSE": False,
+}
+
+# number of rows used to infer the type of a column
+INFER_ROWS = 100
+
+
+# file extension -> compression, for compression="infer"
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zip": "zip"}
+
+# compression -> function opening a file in text mode
+COMPRESSION_OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+class ZipTextFile(io.TextIOWrapper):
+    """
+    Text file of the single member of a zip archive, which closes the archive
+    when closed
+    """
+
+    def __init__(self, filepath, mode="r"):
+        archive = zipfile.ZipFile(filepath, mode, zipfile.ZIP_DEFLATED)
+        try:
+            if mode == "r":
+                names = archive.namelist()
+                if len(names) != 1:
+                    raise ValueError(
+                        "Zip file must contain exactly one file, found %s" % len(names)
+                    )
+                member = archive.open(names[0])
+            else:
+                name = os.path.basename(filepath)
+                if name.endswith(".zip"):
+                    name = name[:-4]
+                member = archive.open(name, "w")
+        except ValueError:
+            archive.close()
+            raise
+        self.archive = archive
+        super().__init__(member, newline="")
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.archive.close()
+
+
+def infer_compression(filepath, compression="infer"):
+    """
+    Finds the compression of a file from its extension for "infer"
+    :return: str, or None for no compression
+    """
+    if compression != "infer":
+        return compression
+    if not isinstance(filepath, str):
+        return None
+    for extension, name in COMPRESSION_EXTENSIONS.items():
+        if filepath.endswith(extension):
+            return name
+    return None
+
+
+# bytes buffered when writing an uncompressed file
+WRITE_BUFFER = 1 << 20
+
+
+def open_file(filepath, mode="r", compression="infer"):
+    """
+    Opens a file in text mode, decompressing it as it is read, or compressing
+    it as it is written. File objects are returned as they are.
+
+    :param filepath: str, path or file object
+    :param mode: str, 'r' or 'w'
+    :param compression: str, 'gzip', 'bz2', 'xz' or 'zip', 'infer' to go by
+    the file extension, or None
+    :return: file object
+    """
+    if hasattr(filepath, "read") or hasattr(filepath, "write"):
+        return filepath
+    # see if there is an fspath
+    try:
+        filepath = filepath.__fspath__()
+    except AttributeError:
+        pass
+    compression = infer_compression(filepath, compression)
+    if compression is None:
+        if mode == "w":
+            return open(filepath, mode, WRITE_BUFFER, newline="")
+        return open(filepath, mode, newline="")
+    if compression == "zip":
+        return ZipTextFile(filepath, mode)
+    if compression == "gzip" and mode == "w":
+        # the level of the gzip command, the default of 9 is several times slower
+        return gzip.open(filepath, "wt", compresslevel=6, newline="")
+    try:
+        opener = COMPRESSION_OPENERS[compression]
+    except KeyError:
+        raise ValueError("Unrecognized compression: %s" % compression)
+    return opener(filepath, mode + "t", newline="")
+
+
+def to_bool(value):
+    try:
+        return BOOL_VALUES[value]
+    except KeyError:
+        raise ValueError("%s is not a bool" % value)
+
+
+# type -> function converting a string to it
+CONVERTERS = {
+    bool: to_bool,
+    int: int,
+    float: float,
+    datetime: datetime.fromisoformat,
+    str: str,
+}
+
+# types tried by infer_type, in order
+INFER_ORDER = (bool, int, float, datetime)
+
+
+def infer_type(values, na_values, rows=INFER_ROWS):
+    """
+    Finds the first of bool, int, float and datetime that every value of the
+    first rows that aren't nan can be converted to, or str
+    :param values: list of str
+    :param na_values: set of str read as nan
+    :param rows: int, number of values to check, or None for every value
+    :return: type, or None if every value is nan
+    """
+    sample = list(islice((val for val in values if val not in na_values), rows))
+    if not sample:
+        return None
+    for kind in INFER_ORDER:
+        try:
+            list(map(CONVERTERS[kind], sample))
+        except ValueError:
+            continue
+        return kind
+    return str
+
+
+def convert_column(values, kind, na_values, typed=False, guess=None):
+    """
+    Converts a column of strings in one pass
+
+    :param values: list of str
+    :param kind: type to convert to, or None to infer one. Any other function
+    of one string is applied as is.
+    :param na_values: set of str read as nan
+    :param typed: bool, store homogeneous int/float/bool columns in arrays
+    :param guess: type to try before inferring one, e.g. the type of the
+    previous chunk of the column
+    :return: tuple of the list or array, and the type converted to, None if
+    it was inferred from values that are all nan
+    """
+    inferred = kind is None
+    if inferred:
+        kind = guess or infer_type(values, na_values)
+        if kind is None:
+            # nothing to go by, a later chunk infers the type
+            return [nan] * len(values), None
+    convert = CONVERTERS.get(kind, kind)
+    has_na = not na_values.isdisjoint(values)
+    try:
+        if has_na:
+            res = [nan if val in na_values else convert(val) for val in values]
+        elif kind is str:
+            res = values
+        else:
+            res = list(map(convert, values))
+    except ValueError:
+        if not inferred:
+            raise
+        # the first rows didn't show the type of the whole column
+        kind = infer_type(values, na_values, None)
+        return convert_column(values, kind, na_values, typed)
+    if typed and not has_na and kind in TYPECODES:
+        return to_typed(res, TYPECODES[kind]), kind
+    return res, kind
+
+
+def usecol_positions(usecols, labels):
+    """
+    Finds the positions of the columns to read, in the order of the file
+    :param usecols: iterable of column labels or positions
+    :param labels: list, labels of the columns in the file
+    :return: list of int
+    """
+    positions = set()
+    for col in usecols:
+        if col in labels:
+            positions.add(labels.index(col))
+        elif isinstance(col, int):
+            positions.add(col)
+        else:
+            raise ValueError("usecols do not match columns: %s" % col)
+    return sorted(positions)
+
+
+def project_rows(rows, positions):
+    """
+    Takes the fields at the given positions out of each row. Fields missing
+    from short or blank rows are read as empty, like the other columns of
+    those rows.
+
+    :param rows: iterable of lists of str
+    :param positions: sorted list of two or more ints
+    :return: iterator of tuples of str
+    """
+    get = operator.itemgetter(*positions)
+    width = positions[-1] + 1
+    padding = [""] * width
+    for row in rows:
+        if len(row) < width:
+            row = row + padding
+        yield get(row)
+
+
+def project_row(rows, position):
+    """
+    project_rows for a single position
+    """
+    for row in rows:
+        yield (row[position] if position < len(row) else "",)
+
+
+class CSVReader:
+    """
+    Parses a CSV file into DataFrames, reading rows as they are asked for.
+    read_csv returns one for chunksize or iterator, which yields a DataFrame
+    of chunksize rows at a time.
+
+    The type of each column is inferred from the first chunk and kept for the
+    rest, unless a later chunk has values that don't fit. The index of each
+    chunk carries on from the previous one.
+    """
+
+    def __init__(
+        self,
+        filepath,
+        sep=",",
+        header=0,
+        names=None,
+        index_col=None,
+        usecols=None,
+        dtype=None,
+        na_values=None,
+        skiprows=None,
+        nrows=None,
+        typed=False,
+        chunksize=None,
+        compression="infer",
+    ):
+        """
+        See read_csv
+        """
+        if names is not None:
+            header = None
+        self.names = names
+        self.header = header
+        self.index_col = index_col
+        self.dtype = dtype
+        self.na_values = NA_VALUES if na_values is None else NA_VALUES.union(na_values)
+        self.typed = typed
+        self.chunksize = chunksize
+        self.kinds = {}
+        # column position -> type the column must be converted to
+        self.forced_kinds = {}
+        self.rows_read = 0
+
+        self.labels = []
+        self.positions = None
+        self.filepath = filepath
+        self.file = open_file(filepath, "r", compression)
+        try:
+            reader = self.csv_reader = csv.reader(self.file, delimiter=sep)
+            if isinstance(skiprows, int):
+                reader = islice(reader, skiprows, None)
+            elif skiprows is not None:
+                skiprows = set(skiprows)
+                reader = (row for i, row in enumerate(reader) if i not in skiprows)
+            if header is not None:
+                # rows before the header are skipped
+                self.labels = next(islice(reader, header, None), [])
+            if usecols is not None:
+                file_labels = self.labels if names is None else list(names)
+                positions = self.positions = usecol_positions(usecols, file_labels)
+                if names is not None and len(names) == len(positions):
+                    self.labels = list(names)
+                elif file_labels and positions and positions[-1] >= len(file_labels):
+                    # short rows are padded, but a column past the labels
+                    # isn't in the file
+                    raise ValueError("usecols do not match columns: %s" % positions[-1])
+                else:
+                    self.labels = [
+                        file_labels[pos] if pos < len(file_labels) else pos
+                        for pos in positions
+                    ]
+                # drop the other fields as each row is parsed
+                if len(positions) == 1:
+                    reader = project_row(reader, positions[0])
+                else:
+                    reader = project_rows(reader, positions)
+            if nrows is not None:
+                reader = islice(reader, nrows)
+            self.reader = reader
+        except ValueError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # file objects passed in are left open
+        if self.file is not self.filepath:
+            self.file.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.get_chunk()
+
+    def get_chunk(self, size=None):
+        """
+        Reads the next rows
+        :param size: int, number of rows. Defaults to chunksize, or every row
+        :return: DataFrame
+        :raises StopIteration: once every row has been read
+        """
+        if self.file.closed:
+            raise StopIteration
+        rows = self.read_rows(size or self.chunksize)
+        if not rows:
+            self.close()
+            raise StopIteration
+        return self.build(rows)
+
+    def read_rows(self, size=None):
+        """
+        Parses the next rows
+        :param size: int, number of rows, or None for every row
+        :return: list of lists of str
+        """
+        return list(islice(self.reader, size))
+
+    def build(self, rows):
+        """
+        Converts parsed rows to a DataFrame, one column at a time
+        """
+        cols = [list(col) for col in zip_longest(*rows, fillvalue="")]
+        return self.build_columns(cols, len(rows))
+
+    def build_columns(self, cols, length):
+        """
+        Converts columns of str to a DataFrame
+        :param cols: list of lists of str
+        :param length: int, number of rows
+        """
+        labels = list(self.labels)
+        if self.positions is None:
+            if self.names is not None:
+                labels = list(self.names)
+                if self.index_col is not None and len(labels) < len(cols):
+                    # names only label the columns that aren't the index
+                    labels.insert(self.index_col, None)
+            elif self.header is None:
+                labels = list(range(len(cols)))
+        cols += [[""] * length for _ in range(len(labels) - len(cols))]
+        labels += list(range(len(labels), len(cols)))
+
+        dtype = self.dtype
+        blocks = []
+        for i, (label, col) in enumerate(zip(labels, cols)):
+            kind = dtype.get(label) if isinstance(dtype, dict) else dtype
+            kind = self.forced_kinds.get(i, kind)
+            col, self.kinds[i] = convert_column(
+                col, kind, self.na_values, self.typed, self.kinds.get(i)
+            )
+            blocks.append(col)
+
+        start = self.rows_read
+        self.rows_read += length
+        if self.index_col is not None:
+            index = blocks.pop(self.index_col)
+            labels.pop(self.index_col)
+            index = index.tolist() if hasattr(index, "tolist") else index
+        else:
+            index = RangeIndex(start, self.rows_read)
+        return DataFrame.from_blocks(blocks, index, labels)
+
+
+class SplitError(Exception):
+    """
+    Raised when the lines of a CSV file can't be split apart as bytes, as a
+    quoted field may hold a newline
+    """
+
+
+def skip_header(f, sep, header, names, skiprows):
+    """
+    Moves a CSV file opened in binary mode to its first data line
+    :return: list of the labels in the header row, or None if it isn't read
+    """
+    for _ in range(skiprows or 0):
+        f.readline()
+    if names is not None or header is None:
+        return None
+    lines = b"".join(f.readline() for _ in range(header + 1))
+    if lines.count(b'"') % 2:
+        raise SplitError("A quoted field of the header holds a newline")
+    lines = io.TextIOWrapper(io.BytesIO(lines), newline="")
+    return next(islice(csv.reader(lines, delimiter=sep), header, None), [])
+
+
+def read_csv_range(filepath, start, stop, options, forced_kinds):
+    """
+    Parses the rows between two byte offsets of a CSV file. Run in the worker
+    processes of read_csv.
+
+    :param options: dict of CSVReader keyword arguments
+    :param forced_kinds: dict of column position -> type to convert to
+    :return: tuple of the column labels, the blocks, the index values or None,
+    and the dict of column position -> type converted to
+    :raises SplitError: if a quoted field may hold a newline
+    """
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    text = io.TextIOWrapper(io.BytesIO(data), newline="").read()
+    if text.count('"') % 2:
+        raise SplitError("A quoted field runs over the end of the range")
+    reader = CSVReader(io.StringIO(text), header=None, **options)
+    reader.forced_kinds = forced_kinds
+    rows = reader.read_rows()
+    if reader.csv_reader.line_num != len(rows):
+        raise SplitError("A quoted field holds a newline")
+    df = reader.build(rows)
+    index = None if options["index_col"] is None else list(df.index)
+    return list(df.columns), df.data.blocks, index, reader.kinds
+
+
+def only_nan(values):
+    return not isinstance(values, array) and all(map(operator.is_, values, repeat(nan)))
+
+
+def column_of(result, col, index_col):
+    """
+    Finds the values of a column in a result of read_csv_range
+    :param col: int, position of the column among the columns read
+    """
+    if index_col is None or col < index_col:
+        return result[1][col]
+    if col == index_col:
+        return result[2]
+    return result[1][col - 1]
+
+
+# read_csv_range kinds, from the narrowest
+KIND_ORDER = INFER_ORDER + (str,)
+
+
+def read_csv_parallel(
+    filepath,
+    workers,
+    sep,
+    header,
+    names,
+    index_col,
+    usecols,
+    dtype,
+    na_values,
+    skiprows,
+    typed,
+):
+    """
+    Reads a CSV file in newline-aligned byte ranges, one per worker process,
+    and joins the columns of each range in order. See read_csv.
+
+    Columns that were inferred as different types in different ranges are
+    parsed again as the widest of those types, or as str.
+
+    :return: DataFrame
+    :raises SplitError: if the file has to be read by a single process
+    """
+    with open(filepath, "rb") as f:
+        labels = skip_header(f, sep, header, names, skiprows)
+        start = f.tell()
+        size = f.seek(0, os.SEEK_END)
+        bounds = [start]
+        for i in range(1, workers):
+            # start each range at the line after its share of the bytes
+            f.seek(max(start + (size - start) * i // workers - 1, bounds[-1]))
+            f.readline()
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+        bounds.append(size)
+    if len(bounds) < 3:
+        raise SplitError("The file is too small to split")
+
+    options = {
+        "sep": sep,
+        "names": labels if labels is not None else names,
+        "index_col": index_col,
+        "usecols": usecols,
+        "dtype": dtype,
+        "na_values": na_values,
+        "typed": typed,
+    }
+    try:
+        # the options are sent to every worker process
+        pickle.dumps(options)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        raise SplitError("The options can't be pickled, e.g. a lambda in dtype")
+    with ProcessPoolExecutor(min(workers, len(bounds) - 1)) as executor:
+
+        def parse(positions, forced_kinds):
+            return executor.map(
+                read_csv_range,
+                repeat(filepath),
+                [bounds[i] for i in positions],
+                [bounds[i + 1] for i in positions],
+                repeat(options),
+                repeat(forced_kinds),
+            )
+
+        results = list(parse(range(len(bounds) - 1), {}))
+        # ranges where a column is only nan hold the same values whatever its
+        # type, so they are left out when comparing types
+        typed_ranges = {
+            col: [
+                i
+                for i, res in enumerate(results)
+                if not only_nan(column_of(res, col, index_col))
+            ]
+            for col in results[0][3]
+        }
+        forced_kinds = {}
+        for col, positions in typed_ranges.items():
+            found = {results[i][3][col] for i in positions}
+            if len(found) > 1:
+                forced_kinds[col] = max(found, key=KIND_ORDER.index)
+        while forced_kinds:
+            redo = sorted(
+                {
+                    i
+                    for col, kind in forced_kinds.items()
+                    for i in typed_ranges[col]
+                    if results[i][3][col] is not kind
+                }
+            )
+            try:
+                for i, res in zip(redo, list(parse(redo, forced_kinds))):
+                    results[i] = res
+                break
+            except ValueError:
+                if all(kind is str for kind in forced_kinds.values()):
+                    raise
+                # the widest type doesn't fit every range
+                forced_kinds = dict.fromkeys(forced_kinds, str)
+
+    blocks = [concat_values(parts) for parts in zip(*[res[1] for res in results])]
+    if index_col is None:
+        index = RangeIndex(sum(len(res[1][0]) for res in results if res[1]))
+    else:
+        index = [label for res in results for label in res[2]]
+    return DataFrame.from_blocks(blocks, index, results[0][0])
+
+
+def decode_column(values, encoding):
+    """
+    Decodes a column of bytes in one call
+    """
+    if not values:
+        return []
+    return b"\n".join(values).decode(encoding).split("\n")
+
+
+def split_columns(data, sep):
+    """
+    Splits lines holding the same number of fields into columns of bytes, with
+    one split of the whole buffer rather than one per line
+
+    :param data: bytes, lines without quotes
+    :param sep: bytes, delimiter
+    :return: list of lists of bytes, or None if the lines have different
+    numbers of fields
+    """
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n")
+        if b"\r" in data:
+            return None
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    if not data:
+        return []
+    lines = data.count(b"\n") + 1
+    # each line but the first starts with a field beginning with a newline
+    fields = data.replace(b"\n", sep + b"\n").split(sep)
+    width = len(fields) // lines
+    if (
+        len(fields) != lines * width
+        or b"".join(fields[width::width]).count(b"\n") != lines - 1
+    ):
+        return None
+    first = b"".join(fields[::width]).split(b"\n")
+    return [first] + [fields[i::width] for i in range(1, width)]
+
+
+def read_csv_mmap(
+    filepath,
+    sep,
+    header,
+    names,
+    index_col,
+    usecols,
+    dtype,
+    na_values,
+    skiprows,
+    skipfooter,
+    nrows,
+    typed,
+):
+    """
+    Reads a CSV file through a memory map. See read_csv.
+
+    Lines are found and split into fields on the raw bytes, and only the
+    bytes of the columns read are decoded, each column in one go. Lines past
+    nrows are never paged in.
+
+    :raises SplitError: if the file holds a quote, as fields then have to be
+    parsed by csv.reader
+    """
+    encoding = locale.getpreferredencoding(False)
+    with open(filepath, "rb") as f:
+        labels = skip_header(f, sep, header, names, skiprows)
+        start = f.tell()
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap can't map an empty file
+            mapped = None
+    data = b""
+    if mapped is not None:
+        with mapped:
+            stop = len(mapped)
+            if nrows is not None:
+                stop = start
+                for _ in range(nrows):
+                    stop = mapped.find(b"\n", stop) + 1
+                    if not stop:
+                        stop = len(mapped)
+                        break
+            if mapped.find(b'"', start, stop) != -1:
+                raise SplitError("The file holds quoted fields")
+            data = mapped[start:stop]
+
+    # only used for its labels and conversions
+    reader = CSVReader(
+        io.StringIO(),
+        sep,
+        None,
+        labels if labels is not None else names,
+        index_col,
+        usecols,
+        dtype,
+        na_values,
+        typed=typed,
+    )
+    sep = sep.encode(encoding)
+    cols = split_columns(data, sep)
+    if cols is not None:
+        length = len(cols[0]) if cols else 0
+        if reader.positions is not None:
+            cols = [
+                cols[pos] if pos < len(cols) else [b""] * length
+                for pos in reader.positions
+            ]
+    else:
+        # lines with different numbers of fields
+        rows = list(map(bytes.split, data.splitlines(), repeat(sep)))
+        length = len(rows)
+        if reader.positions is None:
+            cols = list(zip_longest(*rows, fillvalue=b""))
+        else:
+            # fields missing from short lines are read as empty
+            cols = [
+                [row[pos] if pos < len(row) else b"" for row in rows]
+                for pos in reader.positions
+            ]
+    if skipfooter:
+        length = max(length - skipfooter, 0)
+    cols = [decode_column(col[:length], encoding) for col in cols]
+    return reader.build_columns(cols, length)
+
+
+def read_csv(
+    filepath,
+    sep=",",
+    header=0,
+    names=None,
+    index_col=None,
+    usecols=None,
+    dtype=None,
+    na_values=None,
+    skiprows=None,
+    skipfooter=0,
+    nrows=None,
+    typed=False,
+    chunksize=None,
+    iterator=False,
+    compression="infer",
+    workers=None,
+    engine="csv",
+):
+    """
+    Reads CSV file into dataframe
+
+    The type of each column is inferred from its first rows, trying bool, int,
+    float and datetime (ISO 8601) before str, and each column is then
+    converted in one pass. Values in na_values become nan.
+
+    Columns left out by usecols are dropped as each row is parsed, and rows
+    past nrows are never parsed.
+
+    :param filepath: str, path or file object
+    :param sep: str, delimiter
+    :param header: int, row holding the column labels, or None
+    :param names: list, column labels. The header row is then read as data.
+    :param index_col: int, position of the column to use as the index, among
+    the columns read
+    :param usecols: list of column labels or positions to read
+    :param dtype: type, or dict of column label -> type, to convert to instead
+    of inferring. One of bool, int, float, str or datetime, or any function of
+    one string.
+    :param na_values: iterable of str read as nan, besides NA_VALUES
+    :param skiprows: int, number of rows to skip at the start of the file, or
+    a list of row numbers to skip
+    :param skipfooter: int, number of rows to skip at the end of the file
+    :param nrows: int, number of rows to read, after the header
+    :param typed: bool, store homogeneous int/float/bool columns in arrays
+    :param chunksize: int, return a CSVReader yielding DataFrames of this many
+    rows, so only one chunk is held in memory at a time
+    :param iterator: bool, return a CSVReader, to read with get_chunk
+    :param compression: str, 'gzip', 'bz2', 'xz' or 'zip' to decompress the
+    file as it is read, 'infer' to go by the file extension, or None
+    :param workers: int, number of processes parsing an uncompressed file at
+    once, each a range of its lines. The file is read by a single process if a
+    quoted field holds a newline, or with skiprows as a list, skipfooter,
+    nrows, chunksize or iterator.
+    :param engine: str, 'csv' to read the file as text with csv.reader, or
+    'mmap' to memory map an uncompressed file and split its lines and fields as
+    bytes, decoding only the columns read. 'mmap' reads files holding quotes
+    with 'csv'.
+    :return: DataFrame, or CSVReader
+    """
+    if engine not in ("csv", "mmap"):
+        raise ValueError("engine must be 'csv' or 'mmap', not %s" % engine)
+    try:
+        path = filepath.__fspath__()
+    except AttributeError:
+        path = filepath
+    local = isinstance(path, str) and infer_compression(path, compression) is None
+    row_list = isinstance(skiprows, (list, tuple, set))
+    if engine == "mmap":
+        if not local or row_list or chunksize is not None or iterator:
+            raise ValueError(
+                "engine='mmap' reads the path of an uncompressed file, without "
+                "chunksize, iterator or a list of skiprows"
+            )
+        try:
+            return read_csv_mmap(
+                path,
+                sep,
+                header,
+                names,
+                index_col,
+                usecols,
+                dtype,
+                na_values,
+                skiprows,
+                skipfooter,
+                nrows,
+                typed,
+            )
+        except SplitError:
+            pass
+    elif (
+        workers is not None
+        and workers > 1
+        and local
+        and not row_list
+        and not skipfooter
+        and nrows is None
+        and chunksize is None
+        and not iterator
+    ):
+        try:
+            return read_csv_parallel(
+                path,
+                workers,
+                sep,
+                header,
+                names,
+                index_col,
+                usecols,
+                dtype,
+                na_values,
+                skiprows,
+                typed,
+            )
+        except SplitError:
+            pass
+    reader = CSVReader(
+        filepath,
+        sep,
+        header,
+        names,
+        index_col,
+        usecols,
+        dtype,
+        na_values,
+        skiprows,
+        nrows,
+        typed,
+        chunksize,
+        compression,
+    )
+    if chunksize is not None or iterator:
+        if skipfooter:
+            reader.close()
+            raise ValueError("skipfooter can't be used with chunksize or iterator")
+        return reader
+    with reader:
+        rows = reader.read_rows()
+    if skipfooter:
+        del rows[max(len(rows) - skipfooter, 0) :]
+    return reader.build(rows)
+
+
+def has_nan(values):
+    """
+    Checks for nan by identity, which doesn't call NaN.__eq__ for every value
+    """
+    return any(map(operator.is_, values, repeat(nan)))
+
+
+def to_csv(
+    df,
+    path_or_buf=None,
+    sep=",",
+    na_rep="",
+    columns=None,
+    header=True,
+    index=True,
+    chunksize=None,
+    compression="infer",
+):
+    """
+    Writes a DataFrame to a CSV file. See DataFrame.to_csv
+    """
+    if columns is not None:
+        df = df.loc[:, list(columns)]
+    rows = df.view[0]
+    blocks = [
+        islice(block, rows.start, rows.stop) for block in df.data.blocks[df.view[1]]
+    ]
+    for i, block in enumerate(df.data.blocks[df.view[1]]):
+        # nan is written as na_rep, so only columns holding one are checked
+        # value by value
+        if not isinstance(block, array) and has_nan(
+            islice(block, rows.start, rows.stop)
+        ):
+            blocks[i] = (
+                na_rep if val is nan else val
+                for val in islice(block, rows.start, rows.stop)
+            )
+    if index:
+        blocks.insert(0, df.index)
+
+    buf = io.StringIO() if path_or_buf is None else path_or_buf
+    f = open_file(buf, "w", compression)
+    try:
+        writer = csv.writer(f, delimiter=sep, lineterminator="\n")
+        if header is not False:
+            labels = list(df.columns if header is True else header)
+            if len(labels) != df.shape[1]:
+                raise ValueError(
+                    "Writing %s cols but got %s aliases" % (df.shape[1], len(labels))
+                )
+            writer.writerow([""] + labels if index else labels)
+        rows = zip(*blocks)
+        if chunksize:
+            chunk = list(islice(rows, chunksize))
+            while chunk:
+                writer.writerows(chunk)
+                chunk = list(islice(rows, chunksize))
+        else:
+            writer.writerows(rows)
+    finally:
+        if f is not buf:
+            f.close()
+    if path_or_buf is None:
+        return buf.getvalue()
+
+
+def json_default(obj):
+    """
+    Serializes values json can't, datetimes as ISO 8601
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def json_null(val):
+    return "null"
+
+
+def json_float(val):
+    """
+    Serializes a float, inf and nan as null since JSON has no token for them
+    """
+    return float.__repr__(val) if val - val == 0 else "null"
+
+
+# exact type -> function serializing it to JSON, faster than JSONEncoder.encode
+JSON_ENCODERS = {
+    int: int.__repr__,
+    float: json_float,
+    str: encode_basestring_ascii,
+    bool: {True: "true", False: "false"}.__getitem__,
+    type(nan): json_null,
+    type(None): json_null,
+}
+
+
+def json_values(values):
+    """
+    Serializes each value of a column to a JSON str, nan as null
+    """
+    kinds = set(map(type, values))
+    if len(kinds) == 1 and next(iter(kinds)) in JSON_ENCODERS:
+        return list(map(JSON_ENCODERS[kinds.pop()], values))
+    encode = json.JSONEncoder(default=json_default).encode
+    get = JSON_ENCODERS.get
+    return [get(type(val), encode)(val) for val in values]
+
+
+def json_keys(labels):
+    """
+    Serializes labels to JSON object keys, followed by a colon
+    """
+    return [json.dumps(str(label)) + ":" for label in labels]
+
+
+def to_json(df, path_or_buf=None, orient="columns", lines=False, compression="infer"):
+    """
+    Writes a DataFrame to a JSON file. See DataFrame.to_json
+    """
+    if orient not in ("records", "columns"):
+        raise ValueError("orient must be 'records' or 'columns', not %s" % orient)
+    if lines and orient != "records":
+        raise ValueError("lines=True is only valid with orient='records'")
+    cols = [json_values(block) for block in df.view_blocks()]
+    if orient == "records":
+        keys = json_keys(df.columns)
+        objects = (
+            "{%s}" % ",".join(map(operator.add, keys, row)) for row in zip(*cols)
+        )
+    else:
+        keys = json_keys(df.index)
+        objects = (
+            "%s{%s}" % (label, ",".join(map(operator.add, keys, col)))
+            for label, col in zip(json_keys(df.columns), cols)
+        )
+
+    buf = io.StringIO() if path_or_buf is None else path_or_buf
+    f = open_file(buf, "w", compression)
+    try:
+        if lines:
+            for obj in objects:
+                f.write(obj)
+                f.write("\n")
+        else:
+            f.write("[" if orient == "records" else "{")
+            f.write(",".join(objects))
+            f.write("]" if orient == "records" else "}")
+    finally:
+        if f is not buf:
+            f.close()
+    if path_or_buf is None:
+        return buf.getvalue()
+
+
+def records_to_columns(records, labels=None, typed=False):
+    """
+    Moves records into columns, adding a column the first time a key is seen.
+    Keys missing from a record, and nulls, become nan.
+
+    :param records: iterable of dicts
+    :param labels: list, columns to start with
+    :param typed: bool, store homogeneous int/float/bool columns in arrays
+    :return: tuple of the list of labels, the list of columns and the number of
+    records
+    """
+    labels = list(labels) if labels is not None else []
+    positions = {label: i for i, label in enumerate(labels)}
+    blocks = [[] for _ in labels]
+    length = 0
+    for record in records:
+        length += 1
+        for key, val in record.items():
+            pos = positions.get(key)
+            if pos is None:
+                pos = positions[key] = len(labels)
+                labels.append(key)
+                blocks.append([nan] * (length - 1))
+            blocks[pos].append(nan if val is None else val)
+        if len(record) != len(blocks):
+            for block in blocks:
+                if len(block) < length:
+                    block.append(nan)
+    if typed:
+        blocks = [to_typed(block) for block in blocks]
+    return labels, blocks, length
+
+
+def iter_json_lines(f, chunksize, close, typed=False):
+    """
+    Yields a DataFrame for every chunksize lines of a JSON lines file. Columns
+    found in one chunk are kept in the next.
+    """
+    try:
+        labels = []
+        start = 0
+        lines = (line for line in f if line.strip())
+        while True:
+            records = list(map(json.loads, islice(lines, chunksize)))
+            if not records:
+                return
+            labels, blocks, _ = records_to_columns(records, labels, typed)
+            yield DataFrame.from_blocks(
+                blocks, RangeIndex(start, start + len(records)), labels
+            )
+            start += len(records)
+    finally:
+        if close:
+            f.close()
+
+
+def read_json(
+    path_or_buf,
+    orient=None,
+    lines=False,
+    chunksize=None,
+    compression="infer",
+    typed=False,
+):
+    """
+    Reads a JSON file into a DataFrame
+
+    Records, from a list or one per line, are moved into columns as they are
+    read, adding a column whenever a new key shows up.
+
+    :param path_or_buf: str, path or file object
+    :param orient: str, 'records' for a list of objects, one per row, or
+    'columns' for an object of column label -> object of index label -> value.
+    Defaults to 'records' for a list and 'columns' for an object.
+    :param lines: bool, read one record per line
+    :param chunksize: int, with lines, return an iterator of DataFrames of this
+    many rows, so only one chunk is held in memory at a time
+    :param compression: str, 'gzip', 'bz2', 'xz' or 'zip', 'infer' to go by
+    the file extension, or None
+    :param typed: bool, store homogeneous int/float/bool columns in arrays
+    :return: DataFrame, or iterator of DataFrames
+    """
+    if chunksize is not None and not lines:
+        raise ValueError("chunksize can only be used with lines=True")
+    f = open_file(path_or_buf, "r", compression)
+    close = f is not path_or_buf
+    if chunksize is not None:
+        return iter_json_lines(f, chunksize, close, typed)
+    try:
+        if lines:
+            # each record is moved into the columns as soon as it is parsed
+            labels, blocks, length = records_to_columns(
+                (json.loads(line) for line in f if line.strip()), typed=typed
+            )
+            return DataFrame.from_blocks(blocks, RangeIndex(length), labels)
+        data = json.load(f)
+    finally:
+        if close:
+            f.close()
+
+    if orient is None:
+        orient = "columns" if isinstance(data, dict) else "records"
+    if orient == "records":
+        labels, blocks, length = records_to_columns(data, typed=typed)
+        return DataFrame.from_blocks(blocks, RangeIndex(length), labels)
+    if orient != "columns":
+        raise ValueError("orient must be 'records' or 'columns', not %s" % orient)
+    # object keys are always str, so the index gets its type back like a csv
+    keys = list(next(iter(data.values()), {}))
+    index = convert_column(keys, None, frozenset())[0]
+    blocks = [
+        [nan if col.get(key) is None else col[key] for key in keys]
+        for col in data.values()
+    ]
+    if typed:
+        blocks = [to_typed(block) for block in blocks]
+    return DataFrame.from_blocks(blocks, index, list(data))
@@ -0,0 +1,362 @@
+"""
+Contains the database-style joins between DataFrames
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import islice, repeat
+import operator
+from .index import RangeIndex
+from .other_stuff import nan
+from .storage import take, to_list
+
+HOW = ("inner", "left", "right", "outer")
+
+
+def merge(
+    left,
+    right,
+    how="inner",
+    on=None,
+    left_on=None,
+    right_on=None,
+    suffixes=("_x", "_y"),
+):
+    """
+    Joins two DataFrames on the values of one or more columns
+
+    If the keys of both DataFrames are already sorted, they are matched in one
+    sweep over both (sort_merge_join). Otherwise a hash table is built on the
+    keys of the smaller DataFrame and probed with the keys of the larger one
+    (hash_join). The output columns are then gathered in bulk from the matched
+    row positions.
+
+    Rows come out in the order of the left DataFrame, or of the right one for
+    how='right'. Rows only found in the other DataFrame of an outer join come
+    last, or in key order if the keys were sorted. nan keys never match.
+
+    :param left: DataFrame
+    :param right: DataFrame
+    :param how: str, 'inner', 'left', 'right' or 'outer'
+    :param on: column label or list of labels found in both DataFrames.
+    Defaults to the columns they have in common.
+    :param left_on: column label or list of labels of left to join on
+    :param right_on: column label or list of labels of right to join on
+    :param suffixes: tuple of two str, added to overlapping column labels
+    :return: DataFrame, with a default index
+    """
+    if how not in HOW:
+        raise ValueError("how must be one of %s, not %s" % (HOW, how))
+    if on is None and left_on is None and right_on is None:
+        on = [label for label in left.columns if label in right.columns]
+        if not on:
+            raise ValueError("No common columns to merge on")
+    if on is not None:
+        left_on = right_on = on
+    if left_on is None or right_on is None:
+        raise ValueError("Both left_on and right_on must be given")
+    left_on = list(left_on) if isinstance(left_on, list) else [left_on]
+    right_on = list(right_on) if isinstance(right_on, list) else [right_on]
+    if len(left_on) != len(right_on):
+        raise ValueError("left_on and right_on must have the same length")
+
+    left_keys = join_keys(left, left_on)
+    right_keys = join_keys(right, right_on)
+    left_pos = right_pos = None
+    if is_monotonic(left_keys) and is_monotonic(right_keys):
+        try:
+            left_pos, right_pos = sort_merge_join(left_keys, right_keys, how)
+        except TypeError:
+            # keys that can't be compared across the two sides
+            pass
+    if left_pos is None:
+        left_pos, right_pos = hash_join(left_keys, right_keys, how)
+    return assemble(
+        left, right, left_pos, right_pos, left_on, right_on, on is not None, suffixes
+    )
+
+
+def join_keys(df, labels):
+    """
+    Returns the key of each viewed row, a tuple if there are several labels
+    """
+    cols = []
+    for label in labels:
+        ser = df.iloc[:, df.columns.get_loc(label)]
+        cols.append(ser.data[ser.view])
+    if len(cols) == 1:
+        return cols[0]
+    return list(zip(*cols))
+
+
+def is_monotonic(keys):
+    """
+    Checks if keys are sorted in increasing order. nans make this False.
+    """
+    try:
+        return all(map(operator.le, keys, islice(keys, 1, None)))
+    except TypeError:
+        return False
+
+
+def sort_merge_join(left_keys, right_keys, how):
+    """
+    Matches the row positions of two sorted lists of keys in one sweep. Runs
+    of equal or unmatched keys are found by bisection.
+
+    :param left_keys: sorted list or array of keys
+    :param right_keys: sorted list or array of keys
+    :param how: str, 'inner', 'left', 'right' or 'outer'
+    :return: tuple of two lists of positions, -1 where a row has no match
+    """
+    keep_left = how in ("left", "outer")
+    keep_right = how in ("right", "outer")
+    left_len = len(left_keys)
+    right_len = len(right_keys)
+    left_pos = []
+    right_pos = []
+    i = j = 0
+    while i < left_len and j < right_len:
+        left_key = left_keys[i]
+        right_key = right_keys[j]
+        if left_key < right_key:
+            # the left rows before right_key have no match
+            end = bisect_left(left_keys, right_key, i)
+            if keep_left:
+                left_pos.extend(range(i, end))
+                right_pos.extend(repeat(-1, end - i))
+            i = end
+        elif right_key < left_key:
+            end = bisect_left(right_keys, left_key, j)
+            if keep_right:
+                left_pos.extend(repeat(-1, end - j))
+                right_pos.extend(range(j, end))
+            j = end
+        else:
+            # every row of the left run matches every row of the right run
+            left_end = bisect_right(left_keys, left_key, i)
+            right_end = bisect_right(right_keys, right_key, j)
+            left_run = range(i, left_end)
+            right_run = range(j, right_end)
+            if how == "right" or len(right_run) == 1:
+                # keep the order of right within the run
+                for pos in right_run:
+                    left_pos.extend(left_run)
+                    right_pos.extend(repeat(pos, len(left_run)))
+            else:
+                for pos in left_run:
+                    left_pos.extend(repeat(pos, len(right_run)))
+                    right_pos.extend(right_run)
+            i = left_end
+            j = right_end
+    if keep_left:
+        left_pos.extend(range(i, left_len))
+        right_pos.extend(repeat(-1, left_len - i))
+    if keep_right:
+        left_pos.extend(repeat(-1, right_len - j))
+        right_pos.extend(range(j, right_len))
+    return left_pos, right_pos
+
+
+def hash_join(left_keys, right_keys, how):
+    """
+    Matches the row positions of two lists of keys
+
+    :param left_keys: list or array of keys
+    :param right_keys: list or array of keys
+    :param how: str, 'inner', 'left', 'right' or 'outer'
+    :return: tuple of two lists of positions, -1 where a row has no match
+    """
+    build_left = len(left_keys) < len(right_keys)
+    if build_left:
+        build, probe = left_keys, right_keys
+        keep_build = how in ("left", "outer")
+        keep_probe = how in ("right", "outer")
+    else:
+        build, probe = right_keys, left_keys
+        keep_build = how in ("right", "outer")
+        keep_probe = how in ("left", "outer")
+
+    table = defaultdict(list)
+    for i, key in enumerate(build):
+        try:
+            table[key].append(i)
+        except TypeError:
+            # nan isn't hashable, and never matches
+            if key is not nan:
+                raise
+    table = dict(table)
+
+    build_pos = []
+    probe_pos = []
+    get = table.get
+    for i, key in enumerate(probe):
+        try:
+            matches = get(key)
+        except TypeError:
+            if key is not nan:
+                raise
+            matches = None
+        if matches:
+            build_pos.extend(matches)
+            probe_pos.extend(repeat(i, len(matches)))
+        elif keep_probe:
+            build_pos.append(-1)
+            probe_pos.append(i)
+
+    if keep_build:
+        matched = set(build_pos)
+        unmatched = [i for i in range(len(build)) if i not in matched]
+        build_pos.extend(unmatched)
+        probe_pos.extend(repeat(-1, len(unmatched)))
+
+    # rows come out in probe order, reorder them if the output should follow
+    # the order of the build side
+    if build_left != (how == "right"):
+        size = len(build)
+        sort_key = [pos if pos >= 0 else size for pos in build_pos]
+        order = sorted(range(len(sort_key)), key=sort_key.__getitem__)
+        build_pos = [build_pos[i] for i in order]
+        probe_pos = [probe_pos[i] for i in order]
+
+    if build_left:
+        return build_pos, probe_pos
+    return probe_pos, build_pos
+
+
+def gather(values, positions):
+    """
+    Takes the values at the given positions, with nan where the position is -1
+    """
+    if -1 in positions:
+        values = to_list(values) + [nan]
+        return list(map(values.__getitem__, positions))
+    return take(values, positions)
+
+
+def assemble(left, right, left_pos, right_pos, left_on, right_on, shared, suffixes):
+    """
+    Builds the joined DataFrame from matched row positions
+
+    :param shared: bool, if the key columns have the same labels on both sides.
+    They are then only output once, filled from right where left has no match.
+    """
+    left_blocks = list(left.view_blocks())
+    right_blocks = list(right.view_blocks())
+    right_cols = [
+        i for i, label in enumerate(right.columns) if not (shared and label in right_on)
+    ]
+    right_labels = [right.columns[i] for i in right_cols]
+    overlap = [label for label in left.columns if label in right_labels]
+
+    labels = []
+    blocks = []
+    for i, label in enumerate(left.columns):
+        values = gather(left_blocks[i], left_pos)
+        if shared and label in left_on and -1 in left_pos:
+            other = right_blocks[right.columns.get_loc(label)]
+            other = gather(other, right_pos)
+            values = [
+                val if pos >= 0 else other_val
+                for val, other_val, pos in zip(values, other, left_pos)
+            ]
+        if label in overlap:
+            label = "%s%s" % (label, suffixes[0])
+        labels.append(label)
+        blocks.append(values)
+    for i, label in zip(right_cols, right_labels):
+        if label in overlap:
+            label = "%s%s" % (label, suffixes[1])
+        labels.append(label)
+        blocks.append(gather(right_blocks[i], right_pos))
+
+    return left.from_blocks(blocks, RangeIndex(len(left_pos)), labels)
+
+
+def merge_asof(left, right, on, by=None, direction="backward", suffixes=("_x", "_y")):
+    """
+    Left joins each row to the nearest row of right, by the value of a sorted
+    column rather than an exact match. Both DataFrames are swept once.
+
+    :param left: DataFrame, sorted by on
+    :param right: DataFrame, sorted by on
+    :param on: column label found in both DataFrames, e.g. a timestamp
+    :param by: column label or list of labels that must also match exactly
+    :param direction: str, 'backward' matches the last row of right whose on is
+    less than or equal, 'forward' the first row greater than or equal, and
+    'nearest' the closest of the two, preferring backward on a tie
+    :param suffixes: tuple of two str, added to overlapping column labels
+    :return: DataFrame, with a default index
+    """
+    if direction not in ("backward", "forward", "nearest"):
+        raise ValueError(
+            "direction must be 'backward', 'forward' or 'nearest', not %s" % direction
+        )
+    left_keys = join_keys(left, [on])
+    right_keys = join_keys(right, [on])
+    if not is_monotonic(left_keys):
+        raise ValueError("left keys must be sorted")
+    if not is_monotonic(right_keys):
+        raise ValueError("right keys must be sorted")
+    if by is None:
+        by = []
+    elif not isinstance(by, list):
+        by = [by]
+    if by:
+        left_by = join_keys(left, by)
+        right_by = join_keys(right, by)
+    else:
+        left_by = [None] * len(left_keys)
+        right_by = [None] * len(right_keys)
+
+    if direction == "forward":
+        right_pos = asof_forward(left_keys, right_keys, left_by, right_by)
+    else:
+        right_pos = asof_backward(left_keys, right_keys, left_by, right_by)
+    if direction == "nearest":
+        forward = asof_forward(left_keys, right_keys, left_by, right_by)
+        for i, (back, ahead) in enumerate(zip(right_pos, forward)):
+            if ahead < 0:
+                continue
+            if back < 0 or (
+                right_keys[ahead] - left_keys[i] < left_keys[i] - right_keys[back]
+            ):
+                right_pos[i] = ahead
+
+    left_pos = list(range(len(left_keys)))
+    return assemble(
+        left, right, left_pos, right_pos, [on] + by, [on] + by, True, suffixes
+    )
+
+
+def asof_backward(left_keys, right_keys, left_by, right_by):
+    """
+    Finds the last position of right_keys less than or equal to each left key,
+    with the same by key, or -1
+    """
+    last = {}
+    right_len = len(right_keys)
+    res = []
+    j = 0
+    for key, by_key in zip(left_keys, left_by):
+        while j < right_len and right_keys[j] <= key:
+            last[right_by[j]] = j
+            j += 1
+        res.append(last.get(by_key, -1))
+    return res
+
+
+def asof_forward(left_keys, right_keys, left_by, right_by):
+    """
+    Finds the first position of right_keys greater than or equal to each left
+    key, with the same by key, or -1
+    """
+    following = {}
+    res = [-1] * len(left_keys)
+    j = len(right_keys) - 1
+    for i in range(len(left_keys) - 1, -1, -1):
+        key = left_keys[i]
+        while j >= 0 and right_keys[j] >= key:
+            following[right_by[j]] = j
+            j -= 1
+        res[i] = following.get(left_by[i], -1)
+    return res
@@ -1,5 +1,10 @@
+from array import array
 from functools import reduce
-from copy import copy
+from itertools import compress
+import heapq
+
+from .index import ensure_index
+from .storage import BoolArray
 
 
 class NaN:
@@ -24,6 +29,10 @@ class NaN:
     def __repr__(self):
         return self.__str__()
 
+    def __reduce__(self):
+        # unpickles as the nan of this module, so `is nan` checks still hold
+        return "nan"
+
     def __add__(self, other):
         return self
 
@@ -53,10 +62,13 @@ def is_bool(key):
     """
     Checks if the first value in some kind of item is a boolean value
     """
+    # masks from comparisons are stored as BoolArrays
+    if isinstance(getattr(key, "data", key), BoolArray):
+        return True
     try:
         item0 = key.iloc[0]
     except AttributeError:
-        if isinstance(key, (list, tuple, set)):
+        if isinstance(key, (list, tuple, set, array)):
             item0 = key[0]
         else:
             item0 = key
@@ -69,6 +81,9 @@ def is_2d_bool(key):
     """
     Checks if an object is a 2D bool key
     """
+    # Series are 1D
+    if hasattr(key, "iloc") and not hasattr(key, "columns"):
+        return False
     try:
         item0 = key.iloc[0, 0]
     except AttributeError:
@@ -81,6 +96,87 @@ def is_2d_bool(key):
     return False
 
 
+def bool_positions(key):
+    """
+    Returns the positions of the True values of a 1D boolean key
+    :param key: list, BoolArray or boolean Series
+    :return: list of int
+    """
+    try:
+        # only the values in a Series' view
+        key = key.data[key.view]
+    except AttributeError:
+        pass
+    if isinstance(key, BoolArray):
+        # iterating bytes avoids creating a bool per value
+        key = key.tobytes()
+    return list(compress(range(len(key)), key))
+
+
+def argsort(columns, ascending=True, na_position="last"):
+    """
+    Finds the order of positions that sorts rows by one or more columns.
+    Sorting is stable, so ties keep their order.
+
+    Each column is sorted with one stable sort, starting from the least
+    significant, so every column can have its own direction and its own nans.
+
+    :param columns: list of lists or arrays of equal length, most significant
+    first
+    :param ascending: bool, or list of bools, one per column
+    :param na_position: str, 'first' or 'last'
+    :return: list of positions
+    """
+    if not isinstance(ascending, (list, tuple)):
+        ascending = [ascending] * len(columns)
+    if len(ascending) != len(columns):
+        raise ValueError(
+            "Length of ascending (%s) != length of by (%s)"
+            % (len(ascending), len(columns))
+        )
+    order = range(len(columns[0])) if columns else range(0)
+    for col, asc in reversed(list(zip(columns, ascending))):
+        nans = []
+        if not isinstance(col, array):
+            nans = [pos for pos in order if col[pos] is nan]
+        valid = [pos for pos in order if col[pos] is not nan] if nans else order
+        valid = sorted(valid, key=col.__getitem__, reverse=not asc)
+        order = nans + valid if na_position == "first" else valid + nans
+    return list(order)
+
+
+def row_keys(columns):
+    """
+    The values rows are compared by, the column itself or a tuple per row if
+    there are several columns
+    """
+    return columns[0] if len(columns) == 1 else list(zip(*columns))
+
+
+def top_positions(columns, n, largest=True, positions=None, keys=None):
+    """
+    Finds the positions of the n largest or smallest rows with a bounded heap,
+    in O(len * log(n)). Ties keep their order and rows with a nan are left out.
+
+    :param columns: list of lists or arrays, compared as a tuple if several
+    :param n: int, number of positions
+    :param largest: bool, False for the smallest
+    :param positions: iterable of ints, only consider these rows
+    :param keys: list of the values compared for each row, see row_keys. Pass
+    it when calling repeatedly on the same columns so it's built only once.
+    :return: list of positions, from the largest (or smallest) row
+    """
+    if keys is None:
+        keys = row_keys(columns)
+    if positions is None:
+        positions = range(len(keys))
+    for col in columns:
+        if not isinstance(col, array):
+            positions = [pos for pos in positions if col[pos] is not nan]
+    select = heapq.nlargest if largest else heapq.nsmallest
+    return select(n, positions, key=keys.__getitem__)
+
+
 def invert(item):
     """
     Copies and inverts a list or nested list
@@ -214,6 +310,7 @@ def list_intersection(a, b):
     """
     Returns the intersection of two lists
     """
+    b = ensure_index(b)
     return [item for item in a if item in b]
 
 
@@ -221,7 +318,8 @@ def list_union(a, b):
     """
     Returns a deduped union of two lists
     """
-    c = list(copy(a))
+    c = list(a)
+    a = ensure_index(a)
     for item in b:
         if item not in a:
             c.append(item)
@@ -0,0 +1,343 @@
+"""
+Contains the pam binary file format, a columnar format that loads without
+parsing. The same layout is used to share DataFrames between processes
+through shared memory.
+
+Layout:
+    MAGIC, a version byte, and the length of the header as 8 little-endian bytes
+    header, JSON holding the column labels, the number of rows, the byte order
+    and where the buffers of the index and of each column are
+    buffers, each starting on an 8 byte boundary
+
+Every column is described by a dict with a kind and the (offset, size) of its
+buffers, relative to the first buffer:
+    'q', 'd' and 'b': the raw bytes of an array of that typecode
+    'str': an array('q') of the character offsets of each value, then the
+    values joined and encoded as UTF-8
+    'datetime': like 'str', holding ISO 8601 strs
+    'json': like 'str', holding each value serialized to JSON, datetimes as
+    an object of DATETIME_KEY -> ISO 8601 str
+A column holding nan also has a 'na' buffer, the bytes of a BoolArray marking
+the nan rows, which are stored as 0 or ''.
+"""
+from array import array
+from datetime import datetime
+from itertools import accumulate, compress, islice
+import json
+import mmap
+import sys
+from .dataframe import DataFrame
+from .index import Index, RangeIndex
+from .io import json_default
+from .other_stuff import nan
+from .storage import TYPECODES, BoolArray
+
+MAGIC = b"PAMBDAS"
+VERSION = 1
+# magic, version byte and header length
+PREFIX_SIZE = len(MAGIC) + 1 + 8
+ALIGNMENT = 8
+
+# stands in for nan in buffers, masked by the 'na' buffer
+FILL_VALUES = {int: 0, float: 0.0, bool: False, str: ""}
+# tags datetimes in 'json' columns, so they are read back as datetimes
+DATETIME_KEY = "__datetime__"
+
+
+def encode_text(values):
+    """
+    Encodes strs as their character offsets and the UTF-8 bytes of them joined
+    """
+    offsets = array("q", [0])
+    offsets.extend(accumulate(map(len, values)))
+    return {"data": offsets.tobytes(), "text": "".join(values).encode("utf-8")}
+
+
+def encode_column(values):
+    """
+    Converts a column to the buffers it is stored in
+
+    :param values: list or array
+    :return: tuple of the spec of the column and a dict of buffer name -> bytes
+    """
+    if isinstance(values, array):
+        return {"kind": values.typecode, "typed": True}, {"data": values.tobytes()}
+    kinds = set(map(type, values))
+    mask = None
+    if type(nan) in kinds:
+        kinds.discard(type(nan))
+        mask = BoolArray(val is nan for val in values)
+    kind = kinds.pop() if len(kinds) == 1 else None
+    if mask is not None and kind in FILL_VALUES:
+        fill = FILL_VALUES[kind]
+        values = [fill if val is nan else val for val in values]
+    spec, buffers = encode_values(values, kind, mask is not None and not kinds)
+    if mask is not None:
+        buffers["na"] = mask.tobytes()
+    return spec, buffers
+
+
+def encode_values(values, kind, only_nan):
+    """
+    Picks the kind a column is stored as, see encode_column
+
+    :param kind: the type of every value that isn't nan, or None if mixed
+    :param only_nan: bool, if every value is nan
+    """
+    if kind in TYPECODES:
+        try:
+            data = array(TYPECODES[kind], values).tobytes()
+            return {"kind": TYPECODES[kind], "typed": False}, {"data": data}
+        except OverflowError:
+            # an int too large for 64 bits
+            pass
+    if kind is str:
+        return {"kind": "str"}, encode_text(values)
+    if kind is datetime:
+        text = ["" if val is nan else val.isoformat() for val in values]
+        return {"kind": "datetime"}, encode_text(text)
+    if only_nan:
+        return {"kind": "str"}, encode_text([""] * len(values))
+    encode = json.JSONEncoder(default=encode_default).encode
+    text = ["null" if val is nan else encode(val) for val in values]
+    return {"kind": "json"}, encode_text(text)
+
+
+def encode_default(obj):
+    """
+    Serializes values json can't in 'json' columns, see decode_object
+    """
+    if isinstance(obj, datetime):
+        return {DATETIME_KEY: obj.isoformat()}
+    return json_default(obj)
+
+
+def decode_object(obj):
+    """
+    Restores the datetimes serialized by encode_default
+    """
+    if len(obj) == 1 and DATETIME_KEY in obj:
+        return datetime.fromisoformat(obj[DATETIME_KEY])
+    return obj
+
+
+def encode(df):
+    """
+    Lays out a DataFrame in the pam format
+    :return: list of bytes, which joined make the file
+    """
+    buffers = []
+
+    def add_column(values):
+        spec, data = encode_column(values)
+        position = sum(map(padded_size, buffers))
+        for name, buf in data.items():
+            spec[name] = [position, len(buf)]
+            position += padded_size(buf)
+            buffers.append(buf)
+        return spec
+
+    index = df.index
+    if isinstance(index, RangeIndex):
+        index_spec = {"range": [index.start, index.stop, index.step]}
+    else:
+        index_spec = add_column(list(index))
+    blocks = [add_column(values) for values in df.view_blocks()]
+    header = json.dumps(
+        {
+            "columns": list(df.columns),
+            "length": df.shape[0],
+            "byteorder": sys.byteorder,
+            "index": index_spec,
+            "blocks": blocks,
+        }
+    ).encode("utf-8")
+
+    pieces = [
+        MAGIC,
+        bytes([VERSION]),
+        len(header).to_bytes(8, "little"),
+        header,
+        bytes(padding(PREFIX_SIZE + len(header))),
+    ]
+    for buf in buffers:
+        pieces.append(buf)
+        pieces.append(bytes(padding(len(buf))))
+    return pieces
+
+
+def to_pam(df, path):
+    """
+    Writes a DataFrame to a pam file. See DataFrame.to_pam
+    """
+    with open(path, "wb") as f:
+        f.writelines(encode(df))
+
+
+def padding(size):
+    """
+    Number of bytes needed after size bytes to reach the next boundary
+    """
+    return -size % ALIGNMENT
+
+
+def padded_size(buf):
+    return len(buf) + padding(len(buf))
+
+
+def read_buffer(view, base, location, typecode, swap):
+    """
+    Copies a buffer out of the memory map into an array
+    """
+    start = base + location[0]
+    res = BoolArray() if typecode == "b" else array(typecode)
+    with view[start : start + location[1]] as buf:
+        res.frombytes(buf)
+    if swap and typecode != "b":
+        res.byteswap()
+    return res
+
+
+def decode_column(view, base, spec, length, swap):
+    """
+    Builds a column from its buffers, reading only their bytes from the map
+    """
+    kind = spec["kind"]
+    if kind in ("str", "datetime", "json"):
+        offsets = read_buffer(view, base, spec["data"], "q", swap)
+        start = base + spec["text"][0]
+        with view[start : start + spec["text"][1]] as buf:
+            text = str(buf, "utf-8")
+        values = list(
+            map(text.__getitem__, map(slice, offsets, islice(offsets, 1, None)))
+        )
+        if kind == "datetime":
+            values = [val and datetime.fromisoformat(val) for val in values]
+        elif kind == "json":
+            decoder = json.JSONDecoder(object_hook=decode_object)
+            values = list(map(decoder.decode, values))
+    else:
+        values = read_buffer(view, base, spec["data"], kind, swap)
+        if not spec.get("typed") or "na" in spec:
+            values = values.tolist()
+    if "na" in spec:
+        mask = read_buffer(view, base, spec["na"], "b", swap)
+        for i in compress(range(length), mask):
+            values[i] = nan
+    return values
+
+
+def label_of(label):
+    """
+    JSON turns tuples into lists, which can't be labels
+    """
+    return tuple(map(label_of, label)) if isinstance(label, list) else label
+
+
+def decode(view, columns=None, source="buffer"):
+    """
+    Builds a DataFrame from the pam format, copying only the buffers of the
+    columns read out of view
+
+    :param view: memoryview
+    :param columns: list of column labels to read, defaults to every column
+    :param source: str, named in errors
+    :return: DataFrame
+    """
+    if view[: len(MAGIC)] != MAGIC:
+        raise ValueError("%s is not in the pam format" % source)
+    version = view[len(MAGIC)]
+    if version > VERSION:
+        raise ValueError(
+            "%s was written by a newer version of pam (%s)" % (source, version)
+        )
+    size = int.from_bytes(view[len(MAGIC) + 1 : PREFIX_SIZE], "little")
+    header = json.loads(bytes(view[PREFIX_SIZE : PREFIX_SIZE + size]))
+    base = PREFIX_SIZE + size + padding(PREFIX_SIZE + size)
+    swap = header["byteorder"] != sys.byteorder
+    length = header["length"]
+
+    labels = [label_of(label) for label in header["columns"]]
+    specs = header["blocks"]
+    if columns is not None:
+        positions = Index(labels)
+        specs = [specs[positions.get_loc(label)] for label in columns]
+        labels = list(columns)
+    blocks = [decode_column(view, base, spec, length, swap) for spec in specs]
+    if "range" in header["index"]:
+        index = RangeIndex(*header["index"]["range"])
+    else:
+        index = decode_column(view, base, header["index"], length, swap)
+        index = Index(map(label_of, index))
+    return DataFrame.from_blocks(blocks, index, labels)
+
+
+def read_pam(path, columns=None):
+    """
+    Reads a pam file written by DataFrame.to_pam
+
+    The file is memory mapped and each column is copied straight out of its
+    buffer, with no parsing of numbers. Only the bytes of the columns that are
+    read are paged in.
+
+    :param path: str or path
+    :param columns: list of column labels to read, defaults to every column
+    :return: DataFrame
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap can't map an empty file
+            raise ValueError("%s is not in the pam format" % path)
+    view = memoryview(mapped)
+    try:
+        return decode(view, columns, path)
+    finally:
+        view.release()
+        mapped.close()
+
+
+def shared_memory_module():
+    """
+    Imports multiprocessing.shared_memory, new in Python 3.8
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError("Shared memory needs Python 3.8 or newer")
+    return shared_memory
+
+
+def to_shared(df, name=None):
+    """
+    Copies a DataFrame into a block of shared memory. See DataFrame.to_shared
+    """
+    pieces = encode(df)
+    shm = shared_memory_module().SharedMemory(
+        name, create=True, size=sum(map(len, pieces))
+    )
+    position = 0
+    for piece in pieces:
+        shm.buf[position : position + len(piece)] = piece
+        position += len(piece)
+    return shm
+
+
+def attach_shared(name, columns=None):
+    """
+    Reads a DataFrame from a block of shared memory written by
+    DataFrame.to_shared, e.g. in a worker process
+
+    Only the block's name is passed between processes. Int, float and bool
+    columns are copied straight out of the block, nothing is unpickled.
+
+    :param name: str, name of the block
+    :param columns: list of column labels to read, defaults to every column
+    :return: DataFrame
+    """
+    shm = shared_memory_module().SharedMemory(name)
+    try:
+        return decode(shm.buf, columns, name)
+    finally:
+        shm.close()
@@ -0,0 +1,202 @@
+"""
+Contains the helpers running DataFrame and Series methods in worker processes,
+threads or coroutines
+
+Objects are split into contiguous partitions of rows (or columns). Only the
+column data, index and labels of each partition are pickled, one task per
+partition, so the cost of shipping a task is spread over many rows. Results
+come back in order and are joined the same way.
+
+Threads and coroutines call a function per value instead, as they are meant
+for functions waiting on I/O. Only a bounded number of calls are in flight.
+"""
+import asyncio
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import reduce
+import operator
+import os
+from .other_stuff import concat
+from .storage import concat_values
+
+
+def partition_bounds(length, npartitions):
+    """
+    Splits range(length) into contiguous parts, of sizes differing by at most
+    one
+    :return: list of (start, stop) tuples, no more than length of them
+    """
+    npartitions = max(min(npartitions, length), 1)
+    size, extra = divmod(length, npartitions)
+    bounds = []
+    start = 0
+    for i in range(npartitions):
+        stop = start + size + (i < extra)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def parts_of(obj):
+    """
+    Takes the column data, index and labels of a DataFrame or Series, which
+    are pickled instead of the object
+    """
+    if hasattr(obj, "columns"):
+        return list(obj.view_blocks()), obj.index, obj.columns
+    return obj.data[obj.view], obj.index, obj.name
+
+
+def rebuild(cls, data, index, labels):
+    """
+    Builds a DataFrame or Series back from parts_of
+    """
+    if hasattr(cls, "from_blocks"):
+        return cls.from_blocks(data, index, labels)
+    return cls.from_data(data, index, labels, slice(0, len(data), 1))
+
+
+def split(obj, npartitions, axis=0):
+    """
+    Splits a DataFrame or Series into contiguous partitions
+    :param axis: int, 0 splits the rows, 1 the columns of a DataFrame
+    :return: list of parts_of each partition
+    """
+    if not hasattr(obj, "columns"):
+        return [
+            parts_of(obj.iloc[start:stop])
+            for start, stop in partition_bounds(len(obj), npartitions)
+        ]
+    return [
+        parts_of(obj.iloc[start:stop, :] if axis == 0 else obj.iloc[:, start:stop])
+        for start, stop in partition_bounds(obj.shape[axis], npartitions)
+    ]
+
+
+def call_partition(func, cls, parts, args, kwargs):
+    """
+    Rebuilds a partition in a worker process and calls func on it
+    :return: tuple of the class and parts_of the result if it is a DataFrame or
+    Series, otherwise None and the result
+    """
+    res = func(rebuild(cls, *parts), *args, **kwargs)
+    if hasattr(res, "iloc"):
+        return res.__class__, parts_of(res)
+    return None, res
+
+
+def map_split(obj, func, npartitions=None, workers=None, axis=0, args=(), kwargs=None):
+    """
+    Calls func on each partition of obj in a process pool
+
+    :param func: picklable function, e.g. defined at the top of a module,
+    taking a partition and *args and **kwargs
+    :param npartitions: int, defaults to one per worker
+    :param workers: int, number of processes, defaults to the number of CPUs
+    :param axis: int, 0 splits the rows, 1 the columns of a DataFrame
+    :return: list of the results of each partition, in order
+    """
+    workers = workers or os.cpu_count() or 1
+    parts = split(obj, npartitions or workers, axis)
+    with ProcessPoolExecutor(min(workers, len(parts))) as executor:
+        futures = [
+            executor.submit(
+                call_partition, func, obj.__class__, part, args, kwargs or {}
+            )
+            for part in parts
+        ]
+        results = [future.result() for future in futures]
+    return [res if cls is None else rebuild(cls, *res) for cls, res in results]
+
+
+def combine(results, axis=0):
+    """
+    Joins the results of each partition in order
+
+    :param results: list of DataFrames or Series. Anything else is returned as
+    it is.
+    :param axis: int, 0 stacks the rows of DataFrames, 1 puts their columns
+    side by side
+    :return: DataFrame, Series, or the list of results
+    """
+    first = results[0]
+    if not all(type(res) is type(first) for res in results):
+        return results
+    if hasattr(first, "columns"):
+        if axis == 0 and all(res.columns == first.columns for res in results):
+            blocks = zip(*[list(res.view_blocks()) for res in results])
+            index = reduce(operator.add, [res.index for res in results])
+            return first.from_blocks(
+                [concat_values(parts) for parts in blocks], index, first.columns
+            )
+        if axis == 1 and all(res.index == first.index for res in results):
+            blocks = [block for res in results for block in res.view_blocks()]
+            labels = reduce(operator.add, [res.columns for res in results])
+            return first.from_blocks(blocks, first.index, labels)
+        return concat(results, axis)
+    if hasattr(first, "index"):
+        values = concat_values([res.data[res.view] for res in results])
+        index = reduce(operator.add, [res.index for res in results])
+        return first.from_data(values, index, first.name, slice(0, len(values), 1))
+    return results
+
+
+def thread_map(func, values, max_workers=None):
+    """
+    Calls func on each value from a thread pool. No more than two calls per
+    thread are submitted ahead of the results collected, so a long list of
+    values doesn't queue a future for each.
+
+    :param func: function of one value
+    :param values: list or array
+    :param max_workers: int, number of threads, defaults to the number of CPUs
+    plus 4, up to 32
+    :return: list of the results, in the order of the values
+    """
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    window = max_workers * 2
+    res = [None] * len(values)
+    with ThreadPoolExecutor(max_workers) as executor:
+        in_flight = {}
+        for i, val in enumerate(values):
+            if len(in_flight) >= window:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    res[in_flight.pop(future)] = future.result()
+            in_flight[executor.submit(func, val)] = i
+        for future, i in in_flight.items():
+            res[i] = future.result()
+    return res
+
+
+async def async_map(coro_func, values, concurrency):
+    """
+    Awaits coro_func for each value, with no more than concurrency calls in
+    flight at once
+
+    :param coro_func: coroutine function of one value
+    :param values: list or array
+    :param concurrency: int
+    :return: list of the results, in the order of the values
+    """
+    res = [None] * len(values)
+    in_flight = {}
+    try:
+        for i, val in enumerate(values):
+            if len(in_flight) >= concurrency:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    res[in_flight.pop(task)] = task.result()
+            in_flight[asyncio.ensure_future(coro_func(val))] = i
+        for task, i in in_flight.items():
+            res[i] = await task
+    finally:
+        for task in in_flight:
+            task.cancel()
+    return res
@@ -1,58 +1,119 @@
 """
 Contains the Series class
 """
+from array import array
 from datetime import datetime
 from .indexers import LocSer, ILocSer
-from .other_stuff import nan, is_bool
+from .index import RangeIndex, ensure_index
+from .other_stuff import argsort, nan, top_positions
+from .parallel import async_map, combine, map_split, thread_map
+from .storage import (
+    compare,
+    invert_mask,
+    is_typed,
+    logical,
+    take,
+    to_list,
+    to_typed,
+)
 import functools
+import operator
 
 
 class Series:
     """
     view: the actual view of the data, including step
+    data is a list, or an array for typed storage (see storage.py)
+    owner: for a column of a DataFrame, the BlockManager and the position of
+    the column. data is then read from the BlockManager, so a typed column
+    turned into a list by a write is seen by the DataFrame and the Series.
     """
 
-    ITERABLE_1D = (list, set, tuple)
+    ITERABLE_1D = (list, set, tuple, array)
 
     @classmethod
-    def from_data(cls, data, index, name=None, view=slice(None, None)):
+    def from_data(cls, data, index, name=None, view=slice(None, None), owner=None):
         """
         Creates a Series from data and an index
+        :param owner: tuple of the BlockManager and column position data is held
+        at, see owner above
         """
         self = cls()
         self.data = data  # full 1D dataset.
-        self.index = tuple(index)  # index, unique to series
+        self.owner = owner
+        self.index = index  # index, unique to series
         self.name = name
         self.view = view  # data[view] = the values
         self.iloc = ILocSer(self)
         self.loc = LocSer(self)
         return self
 
-    def __init__(self, data=None, index=None, name=None):
+    def __init__(self, data=None, index=None, name=None, typed=False):
+        """
+        :param typed: bool, store homogeneous int/float/bool data in an array
+        """
         view = None
         if isinstance(data, self.__class__):
             data = data.data
             index = data.index
             name = data.name
             view = data.view
+        elif isinstance(data, array):
+            view = slice(0, len(data), 1)
         elif isinstance(data, (list, set, tuple)):
             data = list(data)
             view = slice(0, len(data), 1)
         elif isinstance(data, dict):
             name, data = next(iter(data.items()))
             view = slice(0, len(data), 1)
+        if typed and data is not None:
+            data = to_typed(data)
 
         if data and index is None:
-            index = tuple(range(len(data)))
+            index = RangeIndex(len(data))
         self.data = data
         self.view = view
-        self.index = tuple(index) if index else None
+        self.index = index if index else None
         self.name = name
         self.iloc = ILocSer(self)
         self.loc = LocSer(self)
         self.str = STR(self)
         self.dt = DT(self)
 
+    @property
+    def data(self):
+        if self.owner is not None:
+            manager, col = self.owner
+            return manager.blocks[col]
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        # new storage is no longer a column of the owner
+        self._data = data
+        self.owner = None
+
+    def replace_storage(self, data):
+        """
+        Puts back storage a write had to convert, see storage.set_value. A
+        column is replaced in its BlockManager, where every view of it sees it.
+        """
+        if data is self.data:
+            return
+        if self.owner is not None:
+            manager, col = self.owner
+            manager.blocks[col] = data
+        else:
+            self.data = data
+
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, labels):
+        self._index = ensure_index(labels)
+
     def __setitem__(self, key, value):
         self.loc.__setitem__(key, value)
 
@@ -90,8 +151,8 @@ class Series:
             items = []
             for i in item:
                 try:
-                    items.append(names.index(i))
-                except ValueError:
+                    items.append(names.get_loc(i))
+                except KeyError:
                     if isinstance(item, tuple):
                         raise KeyError("%s not found in index." % i)
                     else:
@@ -99,9 +160,9 @@ class Series:
             return items
         elif isinstance(item, slice):
             try:
-                start = None if item.start is None else names.index(item.start)
-                stop = None if item.stop is None else names.index(item.stop)
-            except ValueError:
+                start = None if item.start is None else names.get_loc(item.start)
+                stop = None if item.stop is None else names.get_loc(item.stop)
+            except KeyError:
                 raise KeyError(
                     "At least one of the following values is not in the index: %s %s"
                     % (item.start, item.stop)
@@ -109,56 +170,78 @@ class Series:
             return slice(start, stop)
         else:
             try:
-                return names.index(item)
-            except ValueError:
+                return names.get_loc(item)
+            except KeyError:
                 return None
 
     @property
     def values(self):
-        return self.data[self.view]
+        return to_list(self.data[self.view])
+
+    @property
+    def typed(self):
+        """
+        Whether the data is held in typed storage
+        """
+        return is_typed(self.data)
+
+    def compare(self, other, op):
+        """
+        Compares the viewed values with other, returning a boolean Series
+        backed by a BoolArray mask
+
+        :param other: scalar, iterable or Series
+        :param op: comparison function, e.g. operator.lt
+        :return: Series
+        """
+        mask = compare(self.data[self.view], other, op)
+        return self.from_data(mask, self.index, self.name, slice(0, len(mask), 1))
 
     def __lt__(self, other):
-        ser = self.copy()
-        ser.data = [item < other for item in ser.data]
-        return ser
+        return self.compare(other, operator.lt)
 
     def __le__(self, other):
-        ser = self.copy()
-        ser.data = [item <= other for item in ser.data]
-        return ser
+        return self.compare(other, operator.le)
 
     def __gt__(self, other):
-        ser = self.copy()
-        ser.data = [item > other for item in ser.data]
-        return ser
+        return self.compare(other, operator.gt)
 
     def __ge__(self, other):
-        ser = self.copy()
-        ser.data = [item >= other for item in ser.data]
-        return ser
+        return self.compare(other, operator.ge)
 
     def __eq__(self, other):
-        if isinstance(other, (self.ITERABLE_1D, type(self))):
-            if isinstance(other, type(self)):
-                if other.index != self.index:
-                    raise ValueError(
-                        "Can only compare identically-labeled Series objects"
-                    )
-                else:
-                    data = [item == o for item, o in zip(self, other)]
-            else:
-                data = [item == o for item, o in zip(self, other)]
-        else:
-            data = [item == other for item in self]
-
-        ser = self.copy()
-        ser.data = data
-        return ser
+        if isinstance(other, type(self)) and other.index != self.index:
+            raise ValueError("Can only compare identically-labeled Series objects")
+        return self.compare(other, operator.eq)
 
     def __ne__(self, other):
-        ser = self.copy()
-        ser.data = [item != other for item in ser.data]
-        return ser
+        return self.compare(other, operator.ne)
+
+    def logical(self, other, op):
+        """
+        Combines a boolean Series elementwise with a mask, Series or bool
+
+        :param other: bool, iterable or Series
+        :param op: operator.and_, operator.or_ or operator.xor
+        :return: Series
+        """
+        if isinstance(other, self.__class__):
+            other = other.data[other.view]
+        mask = logical(self.data[self.view], other, op)
+        return self.from_data(mask, self.index, self.name, slice(0, len(mask), 1))
+
+    def __and__(self, other):
+        return self.logical(other, operator.and_)
+
+    def __or__(self, other):
+        return self.logical(other, operator.or_)
+
+    def __xor__(self, other):
+        return self.logical(other, operator.xor)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
 
     def drop(self, labels=None):
         """
@@ -169,7 +252,7 @@ class Series:
         """
         to_delete = self.view.stop
         if labels in self.index:
-            to_delete = self.index.index(labels)
+            to_delete = self.index.get_loc(labels)
 
         self.data = (
             self.data[self.view][0:to_delete] + self.data[self.view][to_delete + 1 :]
@@ -188,11 +271,13 @@ class Series:
 
     def extend(self, index_name, value=None, num=1):
         self.drop()
+        # nan can't be stored in an array
+        self.data = to_list(self.data)
         self.data.extend([nan] * num)
         if isinstance(index_name, self.ITERABLE_1D + (self.__class__,)):
             self.index = self.index + tuple(index_name)
         else:
-            self.index = self.index + (index_name,)
+            self.index = self.index.append(index_name)
         self.view = slice(self.view.start, self.view.stop + num, 1)
 
     def __len__(self):
@@ -259,10 +344,70 @@ class Series:
         self.iloc[:] = res.values
 
     def apply(self, func, *args, **kwargs):
-        cp = self.copy()
-        for i, val in enumerate(cp.values):
-            cp.iloc[i] = func(val, *args, **kwargs)
-        return cp
+        """
+        Applies a function to every value
+        :param func: function of one value, and *args and **kwargs
+        :return: Series
+        """
+        data = [func(val, *args, **kwargs) for val in self.data[self.view]]
+        if self.typed:
+            data = to_typed(data)
+        return self.from_data(data, self.index, self.name, slice(0, len(data), 1))
+
+    def apply_parallel(self, func, *args, workers=None, executor="process", **kwargs):
+        """
+        Applies a function to every value from a pool of processes or threads.
+        Other keyword arguments are passed to func.
+        :param func: function of one value, and *args and **kwargs
+        :param workers: int, number of processes or threads. Defaults to the
+        number of CPUs for processes, and that plus 4, up to 32, for threads
+        :param executor: str, 'process' to split the values across processes in
+        contiguous blocks, func must then be picklable, e.g. defined at the top
+        of a module. 'thread' to call func from a pool of threads, for
+        functions that wait on I/O. Only a few calls per thread are in flight
+        at once.
+        :return: Series, in the order of the values
+        """
+        if executor == "process":
+            return combine(
+                map_split(
+                    self,
+                    Series.apply,
+                    workers=workers,
+                    args=(func,) + args,
+                    kwargs=kwargs,
+                )
+            )
+        if executor != "thread":
+            raise ValueError(
+                "executor must be 'process' or 'thread', not %s" % executor
+            )
+
+        def call(val):
+            return func(val, *args, **kwargs)
+
+        data = thread_map(call, self.data[self.view], workers)
+        if self.typed:
+            data = to_typed(data)
+        return self.from_data(data, self.index, self.name, slice(0, len(data), 1))
+
+    async def apply_async(self, coro_func, *args, concurrency=10, **kwargs):
+        """
+        Awaits a coroutine function for every value, running up to concurrency
+        of them at once. Use as `await ser.apply_async(...)`, or
+        `asyncio.run(ser.apply_async(...))` outside of an event loop.
+        :param coro_func: coroutine function of one value, and *args and **kwargs
+        :param concurrency: int, number of calls in flight at once
+        :return: Series, in the order of the values
+        """
+
+        def call(val):
+            return coro_func(val, *args, **kwargs)
+
+        data = await async_map(call, self.data[self.view], concurrency)
+        if self.typed:
+            data = to_typed(data)
+        return self.from_data(data, self.index, self.name, slice(0, len(data), 1))
 
     def sort_values(self, ascending=True, na_position="last"):
         """
@@ -271,51 +416,66 @@ class Series:
         :param na_position: str, 'first' or 'last'
         :return: Series, sorted
         """
-        # remove nans
-        indices = [i for i, x in enumerate(self.values) if x is nan]
-        nan_index = [self.index[i] for i in indices]
-        new_values = self.values
-        new_index = list(self.index)
-        for i, idx in enumerate(indices):
-            del new_values[idx - i]
-            del new_index[idx - i]
-
-        reverse = not ascending
-        new_values, new_index = zip(
-            *sorted(zip(new_values, new_index), reverse=reverse)
-        )
+        return self.take(argsort([self.data[self.view]], ascending, na_position))
 
-        if na_position == "last":
-            new_values = list(new_values) + [nan] * len(nan_index)
-            new_index = list(new_index) + list(nan_index)
-        else:
-            new_values = [nan] * len(nan_index) + list(new_values)
-            new_index = list(nan_index) + list(new_index)
+    def nlargest(self, n=5):
+        """
+        Returns the n largest values, without sorting every value
+        :param n: int
+        :return: Series, from the largest value
+        """
+        return self.take(top_positions([self.data[self.view]], n))
 
-        return self.from_data(new_values, new_index, name=self.name)
+    def nsmallest(self, n=5):
+        """
+        Returns the n smallest values, without sorting every value
+        :param n: int
+        :return: Series, from the smallest value
+        """
+        return self.take(top_positions([self.data[self.view]], n, largest=False))
+
+    def take(self, positions):
+        """
+        Selects values by position, in the given order
+        :param positions: iterable of ints
+        :return: Series
+        """
+        positions = list(positions)
+        return self.from_data(
+            take(self.data[self.view], positions),
+            self.index.take(positions),
+            self.name,
+            slice(0, len(positions), 1),
+        )
 
     def unique(self):
         return list(set(self.values))
 
-    def __add__(self, other):
-        cp = self.copy()
+    def arithmetic(self, other, op):
+        """
+        Applies a binary operator elementwise, returning a new Series.
+        Typed storage stays typed if the results are still homogeneous.
+
+        :param other: scalar, iterable or Series
+        :param op: function of two arguments, e.g. operator.add
+        :return: Series
+        """
+        values = self.data[self.view]
         if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] += val
+            data = [op(val, o) for val, o in zip(values, other)]
+            # values past the end of other are left as they are
+            data.extend(values[len(data) :])
         else:
-            for i in range(len(self)):
-                cp.data[i] += other
-        return cp
+            data = [op(val, other) for val in values]
+        if self.typed:
+            data = to_typed(data)
+        return self.from_data(data, self.index, self.name, slice(0, len(data), 1))
+
+    def __add__(self, other):
+        return self.arithmetic(other, operator.add)
 
     def __sub__(self, other):
-        cp = self.copy()
-        if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] -= val
-        else:
-            for i in range(len(self)):
-                cp.data[i] -= other
-        return cp
+        return self.arithmetic(other, operator.sub)
 
     def __radd__(self, other):
         try:
@@ -328,44 +488,16 @@ class Series:
         #     return self
 
     def __mul__(self, other):
-        cp = self.copy()
-        if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] *= val
-        else:
-            for i in range(len(self)):
-                cp.data[i] *= other
-        return cp
+        return self.arithmetic(other, operator.mul)
 
     def __truediv__(self, other):
-        cp = self.copy()
-        if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] /= val
-        else:
-            for i in range(len(self)):
-                cp.data[i] /= other
-        return cp
+        return self.arithmetic(other, operator.truediv)
 
     def __floordiv__(self, other):
-        cp = self.copy()
-        if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] //= val
-        else:
-            for i in range(len(self)):
-                cp.data[i] //= other
-        return cp
+        return self.arithmetic(other, operator.floordiv)
 
     def __pow__(self, other):
-        cp = self.copy()
-        if isinstance(other, self.ITERABLE_1D + (self.__class__,)):
-            for i, val in enumerate(other):
-                cp.data[i] **= val
-        else:
-            for i in range(len(self)):
-                cp.data[i] **= other
-        return cp
+        return self.arithmetic(other, operator.pow)
 
     def dropna(self):
         cp = self.copy()
@@ -377,15 +509,11 @@ class Series:
         Returns a bool of whether or not an item is a nan
         :return: Series
         """
-        cp = self.copy()
-        cp.data = [item is nan for item in self.values]
-        return cp
+        return self.compare(nan, operator.is_)
 
     def __invert__(self):
-        cp = self.copy()
-        for i in range(len(cp)):
-            cp.data[i] = not cp.data[i]
-        return cp
+        mask = invert_mask(self.data[self.view])
+        return self.from_data(mask, self.index, self.name, slice(0, len(mask), 1))
 
     def mean(self, dropna=True):
         if dropna:
@@ -0,0 +1,251 @@
+"""
+Contains the typed storage used for homogeneous int, float and bool data
+"""
+from array import array
+from itertools import repeat
+
+# exact python type -> array typecode
+TYPECODES = {bool: "b", int: "q", float: "d"}
+
+
+class BoolArray(array):
+    """
+    A 1 byte per value array('b') that reads back as bools
+    """
+
+    def __new__(cls, values=()):
+        if not isinstance(values, (list, array)):
+            # array() reads the storage of a tuple directly, which a
+            # RangeIndex leaves empty
+            values = list(values)
+        return super().__new__(cls, "b", values)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return BoolArray(array.__getitem__(self, key))
+        return bool(array.__getitem__(self, key))
+
+    def __iter__(self):
+        return map(bool, array.__iter__(self))
+
+    def __reduce__(self):
+        return self.__class__, (array.tolist(self),)
+
+    def __repr__(self):
+        return "BoolArray(%s)" % self.tolist()
+
+    def __copy__(self):
+        return BoolArray(self)
+
+    def tolist(self):
+        return [bool(val) for val in array.tolist(self)]
+
+
+# swaps the 0 and 1 bytes of a BoolArray
+INVERT_TABLE = bytes([1, 0]) + bytes(range(2, 256))
+
+
+def compare(values, other, op):
+    """
+    Compares values elementwise against other, producing a mask
+
+    :param values: list or array, e.g. data[view]
+    :param other: scalar, or iterable compared position by position
+    :param op: comparison function, e.g. operator.lt
+    :return: BoolArray, or a list if a comparison doesn't return a bool
+    """
+    if isinstance(other, (list, tuple, array)) or hasattr(other, "iloc"):
+        res = list(map(op, values, other))
+    else:
+        res = list(map(op, values, repeat(other)))
+    try:
+        return BoolArray(res)
+    except (TypeError, OverflowError):
+        return res
+
+
+def invert_mask(values):
+    """
+    Inverts a mask, returning a BoolArray if it was one
+    """
+    if isinstance(values, BoolArray):
+        inverted = BoolArray()
+        inverted.frombytes(values.tobytes().translate(INVERT_TABLE))
+        return inverted
+    return [not val for val in values]
+
+
+def logical(values, other, op):
+    """
+    Combines a mask elementwise with another mask or a scalar
+
+    Two BoolArrays of the same length are combined as two big integers, which
+    applies the operator to every byte in one pass without creating a bool per
+    value.
+
+    :param values: BoolArray or list of bools
+    :param other: BoolArray, iterable of bools, or a bool
+    :param op: operator.and_, operator.or_ or operator.xor
+    :return: BoolArray
+    """
+    if (
+        isinstance(values, BoolArray)
+        and isinstance(other, BoolArray)
+        and len(values) == len(other)
+    ):
+        res = op(
+            int.from_bytes(values.tobytes(), "little"),
+            int.from_bytes(other.tobytes(), "little"),
+        )
+        mask = BoolArray()
+        mask.frombytes(res.to_bytes(len(values), "little"))
+        return mask
+    if isinstance(other, (list, tuple, array)) or hasattr(other, "iloc"):
+        res = map(op, map(bool, values), map(bool, other))
+    else:
+        res = map(op, map(bool, values), repeat(bool(other)))
+    return BoolArray(res)
+
+
+def typecode_of(values):
+    """
+    Finds the array typecode that can store every value
+
+    :param values: iterable
+    :return: str, or None if the values aren't homogeneous ints, floats or bools
+    """
+    if isinstance(values, array):
+        return values.typecode
+    kind = None
+    for val in values:
+        if kind is None:
+            kind = type(val)
+            if kind not in TYPECODES:
+                return None
+        elif type(val) is not kind:
+            return None
+    return TYPECODES.get(kind)
+
+
+def to_typed(values, typecode=None):
+    """
+    Stores values in an array if they are homogeneous ints, floats or bools,
+    otherwise in a list.
+
+    :param values: iterable
+    :param typecode: str, force a typecode instead of inferring one
+    :return: array or list
+    """
+    if isinstance(values, array) and typecode in (None, values.typecode):
+        return values
+    if not isinstance(values, (list, array)):
+        # e.g. a RangeIndex, whose tuple storage array() would read is empty
+        values = list(values)
+    if typecode is None:
+        typecode = typecode_of(values)
+    if typecode is None or len(values) == 0:
+        return list(values)
+    try:
+        if typecode == "b":
+            return BoolArray(values)
+        return array(typecode, values)
+    except (TypeError, OverflowError):
+        # e.g. an int too large for 64 bits
+        return list(values)
+
+
+def is_typed(data):
+    """
+    Checks if data is held in typed storage
+    """
+    return isinstance(data, array)
+
+
+def to_list(values):
+    """
+    Converts the result of slicing storage to a list
+    """
+    if isinstance(values, list):
+        return values
+    if isinstance(values, array):
+        return values.tolist()
+    return list(values)
+
+
+def take(values, positions):
+    """
+    Gathers the values at the given positions, keeping typed storage typed
+    :param values: list or array
+    :param positions: iterable of ints
+    :return: list or array
+    """
+    res = list(map(values.__getitem__, positions))
+    if isinstance(values, array):
+        return to_typed(res, values.typecode)
+    return res
+
+
+def concat_values(parts):
+    """
+    Joins lists or arrays in order, keeping typed storage typed if every part
+    is an array of the same typecode
+    :param parts: list of lists or arrays
+    :return: list or array
+    """
+    first = parts[0]
+    if all(isinstance(part, array) for part in parts) and all(
+        part.typecode == first.typecode for part in parts
+    ):
+        res = first[:]
+    else:
+        res = list(first)
+    for part in parts[1:]:
+        res.extend(part)
+    return res
+
+
+def set_value(data, key, value):
+    """
+    Assigns value to data[key]. If typed storage can't hold the value, e.g. nan
+    or a float in an int array, it is converted to a list first. The list is a
+    copy, so callers have to put it back wherever data was held.
+
+    :param data: list or array
+    :param key: int
+    :return: list or array holding the value, data itself unless converted
+    """
+    try:
+        data[key] = value
+    except (TypeError, OverflowError):
+        if not isinstance(data, array):
+            raise
+        data = data.tolist()
+        data[key] = value
+    return data
+
+
+def set_slice(data, key, values):
+    """
+    Assigns values to data[key]. Typed storage can only be assigned arrays of
+    its own typecode, so other iterables are converted first. If they don't fit
+    the typecode, the storage is converted to a list instead.
+
+    :param data: list or array
+    :param key: slice
+    :param values: iterable
+    :return: list or array holding the values, data itself unless converted
+    """
+    if isinstance(data, array) and not (
+        isinstance(values, array) and values.typecode == data.typecode
+    ):
+        if not isinstance(values, (list, array)):
+            values = list(values)
+        try:
+            if data.typecode == "b":
+                values = BoolArray(values)
+            else:
+                values = array(data.typecode, values)
+        except (TypeError, OverflowError):
+            data = data.tolist()
+    data[key] = values
+    return data
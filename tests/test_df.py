@@ -1,4 +1,7 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import datetime
+import io
 from datetime import timezone
 import pambdas as pam
 import pytest
@@ -26,6 +29,95 @@ def test_init_series():
     assert ser.values == [1, 100, 1000, 10000]
 
 
+def test_index():
+    idx = pam.Index(["a", "b", "c", "b"])
+    assert idx == ("a", "b", "c", "b")
+    assert idx.get_loc("b") == 1
+    assert "c" in idx
+    assert "z" not in idx
+    with pytest.raises(KeyError):
+        idx.get_loc("z")
+    assert not idx.is_unique
+
+    # slices share the parent's label map
+    child = pam.Index(["a", "b", "c", "d"])[1:3]
+    assert child == ("b", "c")
+    assert child.get_loc("c") == 1
+    with pytest.raises(KeyError):
+        child.get_loc("a")
+
+    # slices of an index with duplicates build their own map
+    child = idx[2:]
+    assert child.get_loc("b") == 1
+
+    # appending hands the label map over to the new index
+    idx = pam.Index(["a", "b"])
+    assert "b" in idx
+    appended = idx.append("c").append("a")
+    assert appended == ("a", "b", "c", "a")
+    assert appended.get_loc("c") == 2
+    assert appended.get_loc("a") == 0
+    assert not appended.is_unique
+    assert "c" not in idx
+    assert isinstance(pam.RangeIndex(2).append(2), pam.RangeIndex)
+
+    # unhashable labels fall back to a linear scan
+    idx = pam.Index([[1], [2]])
+    assert idx.get_loc([2]) == 1
+    assert idx.append([3]).get_loc([3]) == 2
+
+    # labels are looked up through the index
+    df = pam.DataFrame({"one": [1, 2, 3], "two": [2, 3, 4]}, index=["a", "b", "c"])
+    assert isinstance(df.index, pam.Index)
+    assert df.loc[["c", "a"], :].values == [[3, 4], [1, 2]]
+    assert df.iloc[1:, :].loc["c", "two"] == 4
+    ser = df["two"]
+    assert ser.loc[["c", "a"]].values == [4, 2]
+    df.index = ["x", "y", "z"]
+    assert df.loc["y", "one"] == 2
+
+
+def test_range_index():
+    idx = pam.RangeIndex(2, 12, 2)
+    assert len(idx) == 5
+    assert idx == (2, 4, 6, 8, 10)
+    assert (2, 4, 6, 8, 10) == idx
+    assert idx.get_loc(8) == 3
+    assert 5 not in idx
+    with pytest.raises(KeyError):
+        idx.get_loc("a")
+    assert isinstance(idx[1:3], pam.RangeIndex)
+    assert idx[1:3] == (4, 6)
+    assert idx[-1] == 10
+
+    # appending the next label keeps it a range, anything else materializes
+    assert isinstance(idx + (12,), pam.RangeIndex)
+    assert idx + (12,) == (2, 4, 6, 8, 10, 12)
+    assert not isinstance(idx + ("a",), pam.RangeIndex)
+    assert idx + ("a",) == (2, 4, 6, 8, 10, "a")
+    assert ("a",) + idx == ("a", 2, 4, 6, 8, 10)
+
+    # default indexes are ranges
+    df = pam.DataFrame([[1, 2], [2, 3], [3, 4]])
+    assert isinstance(df.index, pam.RangeIndex)
+    assert isinstance(df.columns, pam.RangeIndex)
+    assert isinstance(df.iloc[1:, :].index, pam.RangeIndex)
+    assert df.iloc[1:, :].loc[2, 1] == 4
+    assert isinstance(pam.Series([1, 2, 3]).index, pam.RangeIndex)
+    df = pam.DataFrame({"one": [1, 2]}, index=["a", "b"]).reset_index(drop=True)
+    assert isinstance(df.index, pam.RangeIndex)
+
+    # ranges hold no tuple storage, their labels are read by iterating
+    assert 2 * pam.RangeIndex(2) == (0, 1, 0, 1)
+    df = pam.DataFrame({"a": [10, 20, 30], "b": [1.5, 2.5, 3.5]}, typed=True)
+    df.loc[:, "a"] = df.index
+    assert df["a"].values == [0, 1, 2]
+    ser = pam.Series([1, 2, 3], typed=True)
+    ser.iloc[:] = pam.RangeIndex(3)
+    assert ser.values == [0, 1, 2]
+    assert pam.Series(pam.RangeIndex(3), typed=True).values == [0, 1, 2]
+
+
 def test_invert():
     a = [True, False, True]
     assert pam.other_stuff.invert(a) == [False, True, False]
@@ -47,6 +139,74 @@ def test_series_arithmetic():
     assert (ser // ser).values == [1, 1, 1]
 
 
+def test_typed_storage():
+    from array import array
+
+    ser = pam.Series([1, 2, 3], typed=True)
+    assert isinstance(ser.data, array) and ser.data.typecode == "q"
+    assert ser.values == [1, 2, 3]
+    assert (ser + 1).values == [2, 3, 4]
+    assert (ser + 1).typed
+    # results that change type get new storage
+    assert (ser / 2).values == [0.5, 1.0, 1.5]
+    assert (ser / 2).data.typecode == "d"
+    assert ser.astype(float).values == [1.0, 2.0, 3.0]
+    ser.iloc[1:] = [20, 30]
+    assert ser.values == [1, 20, 30]
+    assert ser.iloc[[0, 2]].values == [1, 30]
+    ser.loc["new"] = 40
+    assert ser.values == [1, 20, 30, 40]
+
+    ser = pam.Series([True, False, True], typed=True)
+    assert ser.data.typecode == "b"
+    assert ser.values == [True, False, True]
+    assert pam.Series([10, 20, 30]).iloc[ser.data].values == [10, 30]
+
+    # non-homogeneous data stays a list
+    assert not pam.Series([1, 2.0, "a"], typed=True).typed
+
+    df = pam.DataFrame({"one": [1.0, 2.0, 3.0], "two": [2.0, 3.0, 4.0]}, typed=True)
+    assert df.typed
+    assert df.values == [[1.0, 2.0], [2.0, 3.0], [3.0, 4.0]]
+    assert df["two"].typed
+    df.iloc[1:, 0] = [20.0, 30.0]
+    assert df["one"].values == [1.0, 20.0, 30.0]
+    assert df.copy().typed
+    assert df.applymap(lambda x: x * 2).values == [[2.0, 4.0], [40.0, 6.0], [60.0, 8.0]]
+    df["three"] = 1
+    assert df.values == [[1.0, 2.0, 1], [20.0, 3.0, 1], [30.0, 4.0, 1]]
+
+    # values that don't fit the typecode turn the storage into a list
+    df = pam.DataFrame({"a": [1, 2, 3], "b": [True, False, True]}, typed=True)
+    df.loc[1, "a"] = nan
+    assert df["a"].values == [1, nan, 3]
+    df.iloc[0:2, 1] = ["x", "y"]
+    assert df["b"].values == ["x", "y", True]
+    df.iloc[0] = [nan, nan]
+    assert df.iloc[0].values == [nan, nan]
+    ser = pam.Series([1, 2, 3], typed=True)
+    ser[1] = nan
+    assert ser.values == [1, nan, 3]
+    ser = pam.Series([1, 2, 3], typed=True)
+    ser.iloc[0:2] = [1.5, 2.5]
+    assert ser.values == [1.5, 2.5, 3]
+    assert not ser.typed
+
+    # the converted column is still shared by the frame and its Series
+    df = pam.DataFrame({"a": [1, 2, 3]}, typed=True)
+    ser = df["a"]
+    tail = ser.iloc[1:]
+    ser.iloc[0] = nan
+    ser.iloc[1] = 9
+    assert df["a"].values == [nan, 9, 3]
+    assert tail.values == [9, 3]
+    df = pam.DataFrame({"a": [1, 2, 3]}, typed=True)
+    ser = df["a"]
+    df.loc[0, "a"] = 1.5
+    df.loc[1, "a"] = 8
+    assert ser.values == [1.5, 8, 3]
+
+
 def test_series_methods():
     # drop
     a = pam.Series([0, 1, 2, 3])
@@ -143,23 +303,94 @@ def test_series_methods():
     assert ser.dropna() == pam.Series([1, 2, 3], index=(0, 1, 3))
 
 
+def square(val):
+    return val * val
+
+
+def row_total(row):
+    return sum(row.values)
+
+
+def column_totals(df):
+    return df.sum()
+
+
+def test_parallel_apply():
+    df = pam.DataFrame(
+        {"a": [1, 2, 3, 4, 5], "b": [0.5, 1.5, 2.5, 3.5, 4.5]},
+        index=["v", "w", "x", "y", "z"],
+    )
+    res = df["a"].apply_parallel(square, workers=2)
+    assert res.values == [1, 4, 9, 16, 25]
+    assert res.index == df.index
+    res = df.apply(row_total, axis=1, workers=2)
+    assert res.values == [1.5, 3.5, 5.5, 7.5, 9.5]
+    assert res.index == df.index
+    assert df.apply(sum, workers=2).values == [15, 12.5]
+    res = df.applymap(square, workers=3)
+    assert res.values == df.applymap(square).values
+    assert res.index == df.index
+
+    # each partition gets a block of rows
+    res = df.map_partitions(column_totals, npartitions=3, workers=2)
+    assert res.values == [3, 2, 7, 6, 5, 4.5]
+    assert res.index == ("a", "b") * 3
+    assert df.map_partitions(len, npartitions=2, workers=2) == [3, 2]
+
+
+def test_concurrent_apply():
+    ser = pam.Series(list(range(50)), index=["k%s" % i for i in range(50)])
+    res = ser.apply_parallel(pow, 2, executor="thread", workers=4)
+    assert res.values == [i ** 2 for i in range(50)]
+    assert res.index == ser.index
+    with pytest.raises(ValueError):
+        ser.apply_parallel(square, executor="fiber")
+    # apply passes every keyword argument on to func
+    res = ser.apply(lambda val, workers, executor: val * workers, workers=2, executor=1)
+    assert res.values == [i * 2 for i in range(50)]
+
+    in_flight = []
+    most = []
+
+    async def negate(val, offset=0):
+        in_flight.append(val)
+        most.append(len(in_flight))
+        await asyncio.sleep(0.001 * (val % 3))
+        in_flight.remove(val)
+        return offset - val
+
+    res = asyncio.run(ser.apply_async(negate, offset=1, concurrency=5))
+    assert res.values == [1 - i for i in range(50)]
+    assert res.index == ser.index
+    assert max(most) == 5
+
+
 def test_df_read_csv():
     df = pam.read_csv("tests/test.csv")
+    # "three" is inferred as int, "one" has a str in it
+    assert df.values == [
+        ["0", "hello", 0, "10/1/2020"],
+        ["1", "world", 1, "10/2/2020"],
+        ["2", "how", 2, "10/3/2020"],
+        ["hi", "are", 3, "10/4/2020"],
+    ]
+    assert df.index == (0, 1, 2, 3)
+    assert df.columns == ("one", "two", "three", "four")
+
+    df = pam.read_csv("tests/test.csv", dtype=str)
     assert df.values == [
         ["0", "hello", "0", "10/1/2020"],
         ["1", "world", "1", "10/2/2020"],
         ["2", "how", "2", "10/3/2020"],
         ["hi", "are", "3", "10/4/2020"],
     ]
-    assert df.index == (0, 1, 2, 3)
-    assert df.columns == ("one", "two", "three", "four")
 
     df = pam.read_csv("tests/test.csv", index_col=1)
     assert df.values == [
-        ["0", "0", "10/1/2020"],
-        ["1", "1", "10/2/2020"],
-        ["2", "2", "10/3/2020"],
-        ["hi", "3", "10/4/2020"],
+        ["0", 0, "10/1/2020"],
+        ["1", 1, "10/2/2020"],
+        ["2", 2, "10/3/2020"],
+        ["hi", 3, "10/4/2020"],
     ]
     assert df.columns == ("one", "three", "four")
     assert df.index == ("hello", "world", "how", "are")
@@ -176,6 +407,337 @@ def test_df_read_csv():
     assert df.index == ("two", "hello", "world", "how", "are")
 
 
+def test_read_csv_types(tmp_path):
+    from array import array
+    from pambdas.storage import BoolArray
+
+    path = tmp_path / "types.csv"
+    path.write_text(
+        "i,f,b,d,s,n\n"
+        "1,1.5,True,2020-10-01,a,\n"
+        "2,2,false,2020-10-02 12:30:00,b,NA\n"
+        "3,,TRUE,2020-10-03,,4\n"
+    )
+    df = pam.read_csv(path)
+    assert df.values == [
+        [1, 1.5, True, datetime.datetime(2020, 10, 1), "a", nan],
+        [2, 2.0, False, datetime.datetime(2020, 10, 2, 12, 30), "b", nan],
+        [3, nan, True, datetime.datetime(2020, 10, 3), nan, 4],
+    ]
+    assert isinstance(df.iloc[0, 1], float)
+
+    df = pam.read_csv(path, typed=True, dtype={"i": float, "s": str})
+    assert df.data.blocks[0] == array("d", [1.0, 2.0, 3.0])
+    assert isinstance(df.data.blocks[2], BoolArray)
+    # nans can't be stored in an array
+    assert df.data.blocks[1] == [1.5, 2.0, nan]
+    assert df.loc[:, "s"].values == ["a", "b", nan]
+
+    df = pam.read_csv(path, na_values=["a"])
+    assert df.loc[:, "s"].values == [nan, "b", nan]
+
+    # a type only seen past the first rows
+    path.write_text("x\n" + "1\n" * 200 + "1.5\n")
+    assert pam.read_csv(path).iloc[-1, 0] == 1.5
+
+    with pytest.raises(ValueError):
+        pam.read_csv(path, dtype=int)
+
+    # a type only seen past more blank rows than are sampled
+    path.write_text("x,y\n" + ",1\n" * 150 + "5,1\n")
+    assert pam.read_csv(path)["x"].iloc[-1] == 5
+    chunks = list(pam.read_csv(path, chunksize=100))
+    assert chunks[1]["x"].values[-1] == 5
+
+
+def test_read_csv_subset(tmp_path):
+    path = tmp_path / "subset.csv"
+    path.write_text(
+        "# exported\n"
+        "a,b,c,d\n"
+        "1,x,1.5,True\n"
+        "2,y,2.5,False\n"
+        "3,z,3.5,True\n"
+        "4,w,4.5,False\n"
+        "total,,,\n"
+    )
+    df = pam.read_csv(path, skiprows=1, skipfooter=1)
+    assert df.columns == ("a", "b", "c", "d")
+    assert df["a"].values == [1, 2, 3, 4]
+
+    df = pam.read_csv(path, skiprows=[0, 3], usecols=["c", "a"], nrows=2)
+    assert df.columns == ("a", "c")
+    assert df.values == [[1, 1.5], [3, 3.5]]
+
+    df = pam.read_csv(path, skiprows=1, usecols=[1], nrows=3)
+    assert df.columns == ("b",)
+    assert df.values == [["x"], ["y"], ["z"]]
+
+    df = pam.read_csv(
+        path, skiprows=2, header=None, names=["A", "C"], usecols=[0, 2], index_col=0
+    )
+    assert df.columns == ("C",)
+    assert df.index == ("1", "2", "3", "4", "total")
+    assert df["C"].values == [1.5, 2.5, 3.5, 4.5, nan]
+
+    with pytest.raises(ValueError):
+        pam.read_csv(path, skiprows=1, usecols=["e"])
+    with pytest.raises(ValueError):
+        pam.read_csv(path, skiprows=1, usecols=[4])
+
+    # short and blank lines read as nan, like without usecols
+    path.write_text("a,b,c\n1,x,1.5\n2\n\n")
+    for engine in ("csv", "mmap"):
+        df = pam.read_csv(path, usecols=["a", "c"], engine=engine)
+        assert df.values == [[1, 1.5], [2, nan], [nan, nan]]
+        df = pam.read_csv(path, usecols=["b"], engine=engine)
+        assert df["b"].values == ["x", nan, nan]
+
+
+def test_read_csv_chunks(tmp_path):
+    path = tmp_path / "chunks.csv"
+    path.write_text("a,b\n1,x\n2,y\n3,z\n4,w\n5,NA\n")
+
+    chunks = list(pam.read_csv(path, chunksize=2))
+    assert [chunk.index for chunk in chunks] == [(0, 1), (2, 3), (4,)]
+    assert [chunk["a"].values for chunk in chunks] == [[1, 2], [3, 4], [5]]
+    assert chunks[2]["b"].values == [nan]
+    assert sum(chunk["a"].sum() for chunk in pam.read_csv(path, chunksize=4)) == 15
+
+    # types found in the first chunk carry on, unless they don't fit
+    path.write_text("a\n1\n2\n2.5\n")
+    chunks = list(pam.read_csv(path, chunksize=2))
+    assert [chunk["a"].values for chunk in chunks] == [[1, 2], [2.5]]
+
+    with pam.read_csv(path, iterator=True) as reader:
+        assert reader.get_chunk(1)["a"].values == [1]
+        assert reader.get_chunk()["a"].values == [2.0, 2.5]
+        with pytest.raises(StopIteration):
+            reader.get_chunk()
+    assert list(pam.read_csv(path, chunksize=2, nrows=1))[0].values == [[1]]
+
+    with pytest.raises(ValueError):
+        pam.read_csv(path, chunksize=2, skipfooter=1)
+
+
+def test_read_csv_workers(tmp_path):
+    path = tmp_path / "big.csv"
+    lines = ["%s,%s,x%s" % (i, i if i < 150 else i + 0.5, i) for i in range(200)]
+    path.write_text("a,b,c\n" + "\n".join(lines) + "\n")
+    df = pam.read_csv(path, workers=3)
+    # b is read as floats, though the first ranges only hold ints
+    assert df.values == pam.read_csv(path).values
+    assert df.index == pam.RangeIndex(200)
+    df = pam.read_csv(str(path), workers=2, index_col=0, usecols=["a", "c"])
+    assert df.index == tuple(range(200))
+    assert df["c"].values[-1] == "x199"
+
+    # options that can't be pickled are read by a single process
+    df = pam.read_csv(path, workers=2, dtype={"c": lambda s: s.upper()})
+    assert df["c"].values[-1] == "X199"
+
+    # a quoted field holding a newline is read by a single process
+    path.write_text('a,b\n1,"x\ny"\n' + "2,z\n" * 50)
+    df = pam.read_csv(path, workers=2)
+    assert df.shape == (51, 2)
+    assert df.iloc[0, 1] == "x\ny"
+
+
+def test_read_csv_mmap(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b,c\r\n1,x,1.5\r\n2,,2.5\r\n3,z,3.5\r\n")
+    for kwargs in [{}, {"usecols": ["c", "a"]}, {"nrows": 2}, {"skipfooter": 1}]:
+        df = pam.read_csv(path, engine="mmap", **kwargs)
+        assert df.values == pam.read_csv(path, **kwargs).values
+    df = pam.read_csv(path, engine="mmap", index_col=1)
+    assert df.index == ("x", nan, "z")
+    assert df.columns == ("a", "c")
+
+    # lines with different numbers of fields
+    path.write_text("a,b\n1\n2,3\n")
+    assert pam.read_csv(path, engine="mmap").values == [[1, nan], [2, 3]]
+    # quoted fields are read by csv.reader
+    path.write_text('a,b\n1,"x,\ny"\n')
+    assert pam.read_csv(path, engine="mmap").values == [[1, "x,\ny"]]
+    with pytest.raises(ValueError):
+        pam.read_csv(path, engine="mmap", chunksize=1)
+    with pytest.raises(ValueError):
+        pam.read_csv(path, engine="fast")
+
+
+def test_read_csv_compression(tmp_path):
+    import gzip
+    from pambdas.io import open_file
+
+    text = "a,b\n1,x\n2,y\n"
+    for name in ("test.csv.gz", "test.csv.bz2", "test.csv.xz", "test.csv.zip"):
+        path = str(tmp_path / name)
+        with open_file(path, "w") as f:
+            f.write(text)
+        df = pam.read_csv(path)
+        assert df.values == [[1, "x"], [2, "y"]]
+        with open_file(path) as f:
+            assert f.read() == text
+
+    # an explicit compression, whatever the extension
+    path = str(tmp_path / "gzipped")
+    with open_file(path, "w", compression="gzip") as f:
+        f.write(text)
+    assert pam.read_csv(path, compression="gzip")["a"].values == [1, 2]
+    with pytest.raises(ValueError):
+        pam.read_csv(path, compression="rar")
+
+    # file objects are read as they are, and left open
+    with open(path, "rb") as f:
+        text_file = io.TextIOWrapper(gzip.GzipFile(fileobj=f))
+        assert list(pam.read_csv(text_file, chunksize=1))[1]["b"].values == ["y"]
+        assert not text_file.closed
+
+
+def test_to_csv(tmp_path):
+    df = pam.DataFrame(
+        {"a": [1, 2, 3], "b": ["x", nan, "z,q"], "c": [1.5, 2.5, 3.5]},
+        index=["r1", "r2", "r3"],
+    )
+    assert df.to_csv() == ',a,b,c\nr1,1,x,1.5\nr2,2,,2.5\nr3,3,"z,q",3.5\n'
+    assert (
+        df.iloc[1:, :2].to_csv(index=False, header=["A", "B"], na_rep="NA", sep=";")
+        == "A;B\n2;NA\n3;z,q\n"
+    )
+    assert df.to_csv(columns=["c"], header=False, chunksize=2) == (
+        "r1,1.5\nr2,2.5\nr3,3.5\n"
+    )
+    with pytest.raises(ValueError):
+        df.to_csv(header=["A"])
+
+    for name in ("out.csv", "out.csv.gz", "out.csv.zip"):
+        path = tmp_path / name
+        df.to_csv(str(path))
+        res = pam.read_csv(path, index_col=0)
+        assert res.index == df.index
+        assert res.values == df.values
+
+    # any file object
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    assert buf.getvalue().startswith("a,b,c\n1,x,1.5")
+
+
+def test_json(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        '{"id": 1, "kind": "click"}\n'
+        '{"id": 2, "kind": null, "x": 1.5}\n'
+        "\n"
+        '{"id": 3, "x": 2.5}\n'
+    )
+    df = pam.read_json(path, lines=True)
+    assert df.columns == ("id", "kind", "x")
+    assert df.values == [[1, "click", nan], [2, nan, 1.5], [3, nan, 2.5]]
+
+    chunks = list(pam.read_json(path, lines=True, chunksize=2))
+    assert [chunk.index for chunk in chunks] == [(0, 1), (2,)]
+    # columns found in the first chunk are kept
+    assert chunks[1].columns == ("id", "kind", "x")
+    assert chunks[1].values == [[3, nan, 2.5]]
+    with pytest.raises(ValueError):
+        pam.read_json(path, chunksize=2)
+
+    df = pam.DataFrame(
+        {"a": [1, 2], "b": ["x", nan], "c": [datetime.datetime(2020, 1, 2), True]},
+        index=[10, 20],
+    )
+    assert df.to_json(orient="records") == (
+        '[{"a":1,"b":"x","c":"2020-01-02T00:00:00"},{"a":2,"b":null,"c":true}]'
+    )
+    assert df.to_json(orient="records", lines=True).splitlines()[1] == (
+        '{"a":2,"b":null,"c":true}'
+    )
+    assert df.to_json() == (
+        '{"a":{"10":1,"20":2},"b":{"10":"x","20":null},'
+        '"c":{"10":"2020-01-02T00:00:00","20":true}}'
+    )
+    with pytest.raises(ValueError):
+        df.to_json(lines=True)
+
+    res = pam.read_json(io.StringIO(df.to_json()))
+    assert res.index == (10, 20)
+    assert res.columns == ("a", "b", "c")
+    assert res.values == [[1, "x", "2020-01-02T00:00:00"], [2, nan, True]]
+
+    path = tmp_path / "records.json.gz"
+    df.to_json(str(path), orient="records", lines=True)
+    assert pam.read_json(str(path), lines=True)["a"].values == [1, 2]
+
+    # JSON has no inf or nan, they are written as null
+    df = pam.DataFrame({"f": [1.5, float("inf"), float("nan")], "m": [1, -1e999, "x"]})
+    text = df.to_json(orient="records")
+    assert text == '[{"f":1.5,"m":1},{"f":null,"m":null},{"f":null,"m":"x"}]'
+    assert pam.read_json(io.StringIO(text))["f"].values == [1.5, nan, nan]
+
+
+def test_pam(tmp_path):
+    path = tmp_path / "table.pam"
+    df = pam.DataFrame(
+        {
+            "i": [1, 2, 3],
+            "f": [1.5, nan, 3.5],
+            "s": ["x", "\u00e9t\u00e9", nan],
+            "d": [datetime.datetime(2020, 1, 2), nan, datetime.datetime(2021, 3, 4)],
+            "m": [1, "a", [2, 3]],
+        },
+        index=["a", "b", "c"],
+    )
+    df.to_pam(path)
+    res = pam.read_pam(path)
+    assert res.index == ("a", "b", "c")
+    assert res.columns == ("i", "f", "s", "d", "m")
+    assert res.values == df.values
+    assert not res.typed
+
+    res = pam.read_pam(path, columns=["s", "i"])
+    assert res.columns == ("s", "i")
+    assert res.values == [["x", 1], ["\u00e9t\u00e9", 2], [nan, 3]]
+
+    # typed columns come back typed, and the default index stays a range
+    # datetimes in mixed columns are read back as datetimes
+    stamp = datetime.datetime(2020, 5, 6, 7, 8, tzinfo=timezone.utc)
+    df = pam.DataFrame({"m": [stamp, "a", [2, stamp]]})
+    df.to_pam(path)
+    assert pam.read_pam(path)["m"].values == [stamp, "a", [2, stamp]]
+
+    df = pam.DataFrame({"i": [1, 2], "b": [True, False]}, typed=True)
+    df.to_pam(str(path))
+    res = pam.read_pam(str(path))
+    assert res.typed
+    assert isinstance(res.index, pam.RangeIndex)
+    assert res.values == [[1, True], [2, False]]
+
+    path.write_bytes(b"a,b\n1,2\n")
+    with pytest.raises(ValueError):
+        pam.read_pam(path)
+
+
+def shared_total(name):
+    return sum(pam.attach_shared(name, columns=["i"])["i"].values)
+
+
+def test_shared():
+    # shared memory is new in Python 3.8
+    pytest.importorskip("multiprocessing.shared_memory")
+    df = pam.DataFrame({"i": [1, 2, 3], "s": ["x", nan, "z"]}, index=["a", "b", "c"])
+    shm = df.to_shared()
+    try:
+        res = pam.attach_shared(shm.name)
+        assert res.values == df.values
+        assert res.index == df.index
+        with ProcessPoolExecutor(2) as executor:
+            assert list(executor.map(shared_total, [shm.name] * 2)) == [6, 6]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
 def test_init_dataframe():
     # test dictionary, default index
     df = pam.DataFrame({"one": [1, 2, 3], "two": [2, 3, 4]})
@@ -302,16 +864,18 @@ def test_bound_ser():
     assert a.bound_slice(slice(1, -1)) == slice(3, 7, 2)
     assert a.bound_slice(slice(-3, -1)) == slice(3, 7, 2)
 
+    # columns are stored separately, so a column's view starts at its own data
     a = df.iloc[:, 1]
-    assert a.bound_slice(slice(None, None)) == slice(2, 4, 1)
-    assert a.bound_slice(slice(None, 1)) == slice(2, 3, 1)
-    assert a.bound_slice(slice(None, 100)) == slice(2, 4, 1)
-    assert a.bound_slice(slice(None, -1)) == slice(2, 3, 1)
-    assert a.bound_slice(slice(None, -100)) == slice(2, 2, 1)
-    assert a.bound_slice(slice(1, None)) == slice(3, 4, 1)
-    assert a.bound_slice(slice(100, None)) == slice(4, 4, 1)
-    assert a.bound_slice(slice(-1, None)) == slice(3, 4, 1)
-    assert a.bound_slice(slice(-100, None)) == slice(2, 4, 1)
+    assert a.data is df.data.blocks[1]
+    assert a.bound_slice(slice(None, None)) == slice(0, 2, 1)
+    assert a.bound_slice(slice(None, 1)) == slice(0, 1, 1)
+    assert a.bound_slice(slice(None, 100)) == slice(0, 2, 1)
+    assert a.bound_slice(slice(None, -1)) == slice(0, 1, 1)
+    assert a.bound_slice(slice(None, -100)) == slice(0, 0, 1)
+    assert a.bound_slice(slice(1, None)) == slice(1, 2, 1)
+    assert a.bound_slice(slice(100, None)) == slice(2, 2, 1)
+    assert a.bound_slice(slice(-1, None)) == slice(1, 2, 1)
+    assert a.bound_slice(slice(-100, None)) == slice(0, 2, 1)
 
 
 def test_convert_slice():
@@ -712,6 +1276,58 @@ def test_df_methods():
         assert col_tuple[1] == col
 
 
+def test_masks():
+    from pambdas.storage import BoolArray
+
+    df = pam.DataFrame(
+        {"one": [1, 2, 3, 4], "two": [5, 6, 7, 8]}, index=["a", "b", "c", "d"]
+    )
+    ser = df.iloc[1:, 0]
+    mask = ser > 2
+    assert isinstance(mask.data, BoolArray)
+    assert mask.index == ("b", "c", "d")
+    assert mask.values == [False, True, True]
+    assert (ser != 3).values == [True, False, True]
+    assert (~mask).values == [True, False, False]
+    assert ser[mask].values == [3, 4]
+    assert ser.iloc[mask.data].values == [3, 4]
+    assert pam.Series([1, nan, 3]).isna().values == [False, True, False]
+
+    # row masks from a column filter the frame
+    assert df.loc[df["two"] >= 7, :].values == [[3, 7], [4, 8]]
+    assert df[df["one"] == 2].index == ("b",)
+    assert df.iloc[(df["one"] < 3).data, :].values == [[1, 5], [2, 6]]
+
+    res = df > 3
+    assert all(isinstance(block, BoolArray) for block in res.data.blocks)
+    assert res.values == [[False, True], [False, True], [False, True], [True, True]]
+
+
+def test_logical_masks():
+    from pambdas.storage import BoolArray
+
+    ser = pam.Series([1, 2, 3, 4, 5])
+    mask = (ser > 1) & (ser < 5)
+    assert isinstance(mask.data, BoolArray)
+    assert mask.values == [False, True, True, True, False]
+    assert ((ser < 2) | (ser > 4)).values == [True, False, False, False, True]
+    assert ((ser > 2) ^ (ser > 3)).values == [False, False, True, False, False]
+    assert ((ser > 2) & [True, False, True, False, True]).values == [
+        False,
+        False,
+        True,
+        False,
+        True,
+    ]
+    assert ((ser > 2) | False).values == [False, False, True, True, True]
+    assert ser[(ser > 1) & ~(ser == 3)].values == [2, 4, 5]
+
+    df = pam.DataFrame({"one": [1, 2, 3], "two": [4, 5, 6]})
+    assert df.loc[(df["one"] > 1) & (df["two"] < 6), :].values == [[2, 5]]
+    assert ((df > 1) & (df < 5)).values == [[False, True], [True, False], [True, False]]
+    assert ((df > 5) | True).values == [[True, True], [True, True], [True, True]]
+
+
 def test_df_operators():
     df = pam.DataFrame([[0, 10, 20], [1, 11, 21]])
     assert (df > 10).values == [[False, False, True], [False, True, True]]
@@ -1036,6 +1652,55 @@ def test_df_merging():
     assert a.append(b, ignore_index=False).index == (0, 1, 2, 0, 1, 2)
 
 
+def test_df_blocks():
+    df = pam.DataFrame({"one": [1, 2, 3], "two": [4, 5, 6], "three": [7, 8, 9]})
+
+    # adding a column only adds that column, the others are still shared
+    view = df.iloc[1:, 1:]
+    view["four"] = [10, 11]
+    assert view.columns == ("two", "three", "four")
+    assert view.values == [[5, 8, 10], [6, 9, 11]]
+    assert view.data.blocks[0] is df.data.blocks[1]
+    assert df.columns == ("one", "two", "three")
+
+    # selecting columns by a list copies them, like pandas
+    cp = df.iloc[:, [2, 0]]
+    assert cp.values == [[7, 1], [8, 2], [9, 3]]
+    cp.iloc[0, 0] = 100
+    df[["one", "two"]].iloc[0, 0] = 100
+    assert df.values == [[1, 4, 7], [2, 5, 8], [3, 6, 9]]
+
+    # dropping a column shares the rest
+    blocks = cp.data.blocks
+    cp.drop("three")
+    assert cp.values == [[1], [2], [3]]
+    assert cp.data.blocks[0] is blocks[1]
+
+    # rows are appended to each column
+    blocks = df.data.blocks
+    df.loc[3, :] = 0
+    assert df.values == [[1, 4, 7], [2, 5, 8], [3, 6, 9], [0, 0, 0]]
+    assert df.data.blocks[0] is blocks[0]
+    assert df.index == (0, 1, 2, 3)
+
+    # a view that doesn't end at the last row is copied first
+    df = pam.DataFrame({"one": [1, 2, 3], "two": [4, 5, 6]})
+    view = df.iloc[:2, :]
+    view.loc["new", :] = 0
+    assert view.values == [[1, 4], [2, 5], [0, 0]]
+    assert df.values == [[1, 4], [2, 5], [3, 6]]
+
+    # typed storage is per column
+    df = pam.DataFrame(
+        {"int": [1, 2], "float": [1.0, 2.0], "str": ["a", "b"]}, typed=True
+    )
+    assert [block.typecode for block in df.data.blocks[:2]] == ["q", "d"]
+    assert isinstance(df.data.blocks[2], list)
+    assert df["float"].typed
+    df.loc[2, :] = 0
+    assert df.values == [[1, 1.0, "a"], [2, 2.0, "b"], [0, 0, 0]]
+
+
 def test_df_setitem_create():
     long_df = pam.DataFrame(
         {
@@ -1102,6 +1767,262 @@ def test_groupby():
     assert res.index == ("Falcon", "Parrot")
 
 
+def test_groupby_groups():
+    df = pam.DataFrame(
+        {
+            "Animal": ["Falcon", "Parrot", nan, "Falcon", "Parrot"],
+            "Max Speed": [100, 24, 50, 120, 26],
+        },
+        index=["a", "b", "c", "d", "e"],
+    )
+    gb = df.groupby("Animal")
+    assert gb.groups == {"Falcon": [0, 3], "Parrot": [1, 4]}
+    assert len(gb) == 2
+    assert gb.keys == ("Falcon", "Parrot")
+
+    group = gb.get_group("Parrot")
+    assert group.values == [[24], [26]]
+    assert group.index == ("b", "e")
+    assert group.columns == ("Max Speed",)
+    assert group.name == "Parrot"
+    assert [key for key, _ in gb] == ["Falcon", "Parrot"]
+
+    res = gb.apply(lambda x: max(x))
+    assert res.index == ("Falcon", "Parrot")
+    assert res.values == [[120], [26]]
+
+
+def test_groupby_agg():
+    df = pam.DataFrame(
+        {
+            "Animal": ["Falcon", "Parrot", "Falcon", "Parrot", "Parrot"],
+            "Name": ["a", "b", "c", "d", "e"],
+            "Max Speed": [100, 24, 120, nan, 28],
+        }
+    )
+    gb = df.groupby("Animal")
+    assert gb.count().values == [[2, 2], [3, 2]]
+    assert gb.sum().columns == ("Max Speed",)
+    assert gb.sum().values == [[220], [52]]
+    assert gb.mean().values == [[110.0], [26.0]]
+    assert gb.min().values == [["a", 100], ["b", 24]]
+    assert gb.max().values == [["c", 120], ["e", 28]]
+    assert gb.first().values == [["a", 100], ["b", 24]]
+    assert gb.last().values == [["c", 120], ["e", 28]]
+    assert gb.var().values == [[200.0], [8.0]]
+    assert gb.std().values == [[200 ** 0.5], [8 ** 0.5]]
+
+    res = gb.agg({"Max Speed": ["sum", "mean", max], "Name": "last"})
+    assert res.columns == (
+        ("Max Speed", "sum"),
+        ("Max Speed", "mean"),
+        ("Max Speed", "max"),
+        "Name",
+    )
+    assert res.index == ("Falcon", "Parrot")
+    assert res.values == [[220, 110.0, 120, "c"], [52, 26.0, 28, "e"]]
+
+    # an all nan group
+    df = pam.DataFrame({"k": ["a", "b"], "v": [1, nan]})
+    assert df.groupby("k").agg(["sum", "count"]).values == [[1, 1], [nan, 0]]
+
+
+def test_groupby_multi_key():
+    df = pam.DataFrame(
+        {
+            "tenant": ["a", "a", "b", "a", "b"],
+            "day": [1, 2, 1, 1, nan],
+            "hits": [10, 20, 30, 40, 50],
+        }
+    )
+    gb = df.groupby(["tenant", "day"])
+    assert gb.groups == {("a", 1): [0, 3], ("a", 2): [1], ("b", 1): [2]}
+    assert gb.get_group(("a", 1)).values == [[10], [40]]
+
+    res = gb.sum()
+    assert res.index == (("a", 1), ("a", 2), ("b", 1))
+    assert res.columns == ("hits",)
+    assert res.values == [[50], [20], [30]]
+
+    res = df.groupby(["tenant", "day"], as_index=False).sum()
+    assert res.columns == ("tenant", "day", "hits")
+    assert res.index == (0, 1, 2)
+    assert res.values == [["a", 1, 50], ["a", 2, 20], ["b", 1, 30]]
+
+    res = df.groupby("tenant", as_index=False).agg({"hits": ["min", "max"]})
+    assert res.columns == ("tenant", ("hits", "min"), ("hits", "max"))
+    assert res.values == [["a", 10, 40], ["b", 30, 50]]
+
+
+def test_merge():
+    left = pam.DataFrame({"key": ["a", "b", "c", "a"], "lval": [1, 2, 3, 4]})
+    right = pam.DataFrame({"key": ["a", "c", "d"], "rval": [10, 30, 40]})
+
+    res = pam.merge(left, right, on="key")
+    assert res.columns == ("key", "lval", "rval")
+    assert res.index == (0, 1, 2)
+    assert res.values == [["a", 1, 10], ["c", 3, 30], ["a", 4, 10]]
+
+    res = left.merge(right, how="left")
+    assert res.values == [["a", 1, 10], ["b", 2, nan], ["c", 3, 30], ["a", 4, 10]]
+
+    res = left.merge(right, how="right", on="key")
+    assert res.values == [["a", 1, 10], ["a", 4, 10], ["c", 3, 30], ["d", nan, 40]]
+
+    res = left.merge(right, how="outer", on="key")
+    assert res.values == [
+        ["a", 1, 10],
+        ["b", 2, nan],
+        ["c", 3, 30],
+        ["a", 4, 10],
+        ["d", nan, 40],
+    ]
+
+    # the smaller side is on the left
+    big = pam.DataFrame({"key": ["c", "a", "a", "e", "b"], "rval": [1, 2, 3, 4, 5]})
+    small = pam.DataFrame({"key": ["a", "b", "f"], "lval": [1, 2, 3]})
+    res = small.merge(big, how="outer", on="key")
+    assert res.values == [
+        ["a", 1, 2],
+        ["a", 1, 3],
+        ["b", 2, 5],
+        ["f", 3, nan],
+        ["c", nan, 1],
+        ["e", nan, 4],
+    ]
+
+    # left_on, right_on and suffixes
+    left = pam.DataFrame({"k1": [1, 2], "k2": ["x", "y"], "val": [5, 6]})
+    right = pam.DataFrame({"r1": [2, 1], "r2": ["y", "z"], "val": [7, 8]})
+    res = left.merge(
+        right, left_on=["k1", "k2"], right_on=["r1", "r2"], suffixes=("_l", "_r")
+    )
+    assert res.columns == ("k1", "k2", "val_l", "r1", "r2", "val_r")
+    assert res.values == [[2, "y", 6, 2, "y", 7]]
+
+    with pytest.raises(ValueError):
+        left.merge(right, on="k1", how="sideways")
+
+
+def test_merge_sorted():
+    from pambdas.merge import hash_join, sort_merge_join
+
+    left_keys = [1, 2, 2, 4, 6]
+    right_keys = [0, 2, 2, 3, 4, 7]
+    for how in ("inner", "left", "right"):
+        assert sort_merge_join(left_keys, right_keys, how) == hash_join(
+            left_keys, right_keys, how
+        )
+    # outer joins come out in key order
+    assert sort_merge_join(left_keys, right_keys, "outer") == (
+        [-1, 0, 1, 1, 2, 2, -1, 3, 4, -1],
+        [0, -1, 1, 2, 1, 2, 3, 4, -1, 5],
+    )
+
+    left = pam.DataFrame({"t": [1, 2, 3], "lval": ["a", "b", "c"]})
+    right = pam.DataFrame({"t": [2, 3, 4], "rval": ["x", "y", "z"]})
+    res = left.merge(right, how="outer", on="t")
+    assert res.values == [
+        [1, "a", nan],
+        [2, "b", "x"],
+        [3, "c", "y"],
+        [4, nan, "z"],
+    ]
+
+
+def test_merge_asof():
+    left = pam.DataFrame(
+        {"time": [1, 5, 10, 12], "sym": ["a", "b", "a", "b"], "qty": [1, 2, 3, 4]}
+    )
+    right = pam.DataFrame(
+        {
+            "time": [2, 3, 7, 11],
+            "sym": ["a", "b", "a", "b"],
+            "price": [10, 20, 30, 40],
+        }
+    )
+
+    res = pam.merge_asof(left, right, on="time")
+    assert res.columns == ("time", "sym_x", "qty", "sym_y", "price")
+    assert res["price"].values == [nan, 20, 30, 40]
+
+    res = pam.merge_asof(left, right, on="time", by="sym")
+    assert res.columns == ("time", "sym", "qty", "price")
+    assert res.values == [
+        [1, "a", 1, nan],
+        [5, "b", 2, 20],
+        [10, "a", 3, 30],
+        [12, "b", 4, 40],
+    ]
+
+    res = pam.merge_asof(left, right, on="time", direction="forward")
+    assert res["price"].values == [10, 30, 40, nan]
+
+    res = pam.merge_asof(left, right, on="time", direction="nearest")
+    assert res["price"].values == [10, 20, 40, 40]
+
+    with pytest.raises(ValueError):
+        pam.merge_asof(pam.DataFrame({"time": [3, 1]}), right, on="time")
+
+
+def test_sort_multi_and_take():
+    df = pam.DataFrame(
+        {
+            "tenant": ["b", "a", "b", "a", nan],
+            "score": [1, 5, 3, nan, 2],
+            "name": ["w", "x", "y", "z", "v"],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+    res = df.sort_values(["tenant", "score"], ascending=[True, False])
+    assert res.index == (11, 13, 12, 10, 14)
+    assert res["name"].values == ["x", "z", "y", "w", "v"]
+
+    res = df.sort_values(["tenant", "score"], na_position="first")
+    assert res.index == (14, 13, 11, 10, 12)
+
+    with pytest.raises(ValueError):
+        df.sort_values(["tenant", "score"], ascending=[True])
+
+    res = df.take([4, 0, -1])
+    assert res.index == (14, 10, 14)
+    assert res.values == [[nan, 2, "v"], ["b", 1, "w"], [nan, 2, "v"]]
+    assert res["name"].values == ["v", "w", "v"]
+
+    res = df.take([2, 0], axis=1)
+    assert res.columns == ("name", "tenant")
+    assert res.index == df.index
+    assert res.values[0] == ["w", "b"]
+
+    ser = pam.Series([3, 1, 2], index=["a", "b", "c"])
+    assert ser.take([1, 2]).values == [1, 2]
+    assert ser.take([1, 2]).index == ("b", "c")
+
+
+def test_nlargest():
+    ser = pam.Series([3, 9, nan, 1, 9, 5], index=list("abcdef"))
+    assert ser.nlargest(3).values == [9, 9, 5]
+    assert ser.nlargest(3).index == ("b", "e", "f")
+    assert ser.nsmallest(2).index == ("d", "a")
+    assert ser.nsmallest(10).values == [1, 3, 5, 9, 9]
+
+    df = pam.DataFrame(
+        {
+            "tenant": ["a", "b", "a", "b", "a"],
+            "score": [10, 20, 30, 40, 30],
+            "time": [5, 4, 3, 2, 1],
+        }
+    )
+    assert df.nlargest(2, "score").index == (3, 2)
+    assert df.nlargest(2, ["score", "time"]).index == (3, 2)
+    assert df.nsmallest(2, ["score", "time"]).index == (0, 1)
+
+    res = df.groupby("tenant").nlargest(2, "score")
+    assert res.index == (2, 4, 3, 1)
+    assert res.values == [["a", 30, 3], ["a", 30, 1], ["b", 40, 2], ["b", 20, 4]]
+    assert df.groupby("tenant").nsmallest(1, "time").index == (4, 3)
+
+
 def test_concat():
     # test with Series
     ser1 = pam.Series([1, 2, 3], name="1", index=["one", "two", "three"])